@@ -6,21 +6,25 @@ The details of Language Specific configuration are not exposed to the user.
 """
 
 import asyncio
+import atexit
+import bisect
+import concurrent.futures
 import dataclasses
 import hashlib
-import json
+import itertools
 import logging
 import os
 import pathlib
 import pickle
+import queue
 import re
 import threading
-from collections import defaultdict
-from contextlib import asynccontextmanager, contextmanager
-from copy import copy
+import urllib.parse
+from collections import OrderedDict, defaultdict
+from contextlib import ExitStack, asynccontextmanager, contextmanager
 from fnmatch import fnmatch
 from pathlib import Path, PurePath
-from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union, cast
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, ClassVar, Coroutine, Dict, Iterator, List, Optional, Set, Tuple, TypeVar, Union, cast
 
 from serena.text_utils import LineType, MatchedConsecutiveLines, TextLine, search_text
 from . import multilspy_types
@@ -34,9 +38,15 @@ from .lsp_protocol_handler.server import (
 from .multilspy_config import Language, MultilspyConfig
 from .multilspy_exceptions import MultilspyException
 from .multilspy_logger import MultilspyLogger
-from .multilspy_utils import FileUtils, PathUtils, TextUtils
+from .multilspy_utils import FileUtils, PathUtils, PieceTable, TextUtils
 from .type_helpers import ensure_all_methods_implemented
 
+try:
+    # optional, faster event loop implementation for the loops run by SyncLanguageServer
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Serena dependencies
 # We will need to watch out for circular imports, but it's probably better to not
 # move all generic util code from serena into multilspy.
@@ -47,6 +57,33 @@ from .type_helpers import ensure_all_methods_implemented
 
 
 GenericDocumentSymbol = Union[LSPTypes.DocumentSymbol, LSPTypes.SymbolInformation, multilspy_types.UnifiedSymbolInformation]
+T = TypeVar("T")
+
+_CONTAINER_SYMBOL_KINDS = frozenset({SymbolKind.Method, SymbolKind.Function, SymbolKind.Class})
+"""Kinds of symbols that are considered as containers by request_containing_symbol (currently only for Python)"""
+
+
+def _flatten_document_symbols(
+    root: multilspy_types.UnifiedSymbolInformation,
+    visit: Callable[[GenericDocumentSymbol], None],
+) -> List[multilspy_types.UnifiedSymbolInformation]:
+    """
+    Flattens the symbol tree below the given root into a list (in pre-order, starting with the root itself).
+    Uses an explicit stack instead of recursion; the nodes are not copied, i.e. the list contains the tree's own nodes.
+
+    :param root: the root symbol, which must already have been processed (i.e. have a children list).
+    :param visit: a function that is called on each descendant before its children are accessed; it must ensure that
+        the node has a children list.
+    """
+    children_key = LSPConstants.CHILDREN
+    result = [root]
+    stack = list(reversed(root[children_key]))
+    while stack:
+        node = stack.pop()
+        visit(node)
+        result.append(cast(multilspy_types.UnifiedSymbolInformation, node))
+        stack.extend(reversed(node[children_key]))
+    return result
 
 @dataclasses.dataclass
 class LSPFileBuffer:
@@ -57,8 +94,8 @@ class LSPFileBuffer:
     # uri of the file
     uri: str
 
-    # The contents of the file
-    contents: str
+    # The initial contents of the file (accessible via the contents property)
+    initial_contents: dataclasses.InitVar[str]
 
     # The version of the file
     version: int
@@ -71,10 +108,128 @@ class LSPFileBuffer:
     
     # --------------------------------- MODIFICATIONS BY MISCHA ---------------------------------
     
-    content_hash: str = ""
-    
-    def __post_init__(self):
-        self.content_hash = hashlib.md5(self.contents.encode('utf-8')).hexdigest()
+    _text: PieceTable = dataclasses.field(init=False, repr=False)
+    _content_hash: Optional[str] = dataclasses.field(default=None, init=False, repr=False)
+    _content_hash_version: int = dataclasses.field(default=-1, init=False, repr=False)
+    _chunk_digests: List[bytes] = dataclasses.field(default_factory=list, init=False, repr=False)
+    _first_dirty_index: int = dataclasses.field(default=0, init=False, repr=False)
+    """Index of the first character whose chunk digest is no longer valid"""
+    _lines: Optional[List[str]] = dataclasses.field(default=None, init=False, repr=False)
+    _line_offsets: Optional[List[int]] = dataclasses.field(default=None, init=False, repr=False)
+
+    HASH_CHUNK_SIZE = 65536
+    """Number of characters that are hashed as one chunk"""
+    CONTENT_HASH_ALGORITHM = f"blake2b-128/chunked-{HASH_CHUNK_SIZE}"
+    """
+    Identifies the way content_hash is computed; hashes computed with a different algorithm are not comparable.
+    Must be changed whenever the computation of content_hash changes.
+    """
+
+    def __post_init__(self, initial_contents: str):
+        self._text = PieceTable(initial_contents)
+
+    @property
+    def contents(self) -> str:
+        """
+        The current contents of the file
+        """
+        return self._text.get_text()
+
+    @contents.setter
+    def contents(self, contents: str) -> None:
+        self._text = PieceTable(contents)
+        self._first_dirty_index = 0
+        self._content_hash = None
+        self._lines = None
+        self._line_offsets = None
+
+    @property
+    def lines(self) -> List[str]:
+        """
+        The lines of the current contents (as obtained by splitting at newline characters).
+        The list is computed once for the current contents and must not be modified.
+        """
+        if self._lines is None:
+            self._lines = self.contents.split("\n")
+        return self._lines
+
+    @property
+    def line_offsets(self) -> List[int]:
+        """
+        The indices at which the lines of the current contents start.
+        The list is computed once for the current contents and must not be modified.
+        """
+        if self._line_offsets is None:
+            contents = self.contents
+            line_offsets = [0]
+            index = contents.find("\n")
+            while index != -1:
+                line_offsets.append(index + 1)
+                index = contents.find("\n", index + 1)
+            self._line_offsets = line_offsets
+        return self._line_offsets
+
+    def get_line(self, line: int) -> str:
+        """
+        Returns the given zero-indexed line of the current contents (without the newline character),
+        without splitting the entire contents.
+        """
+        line_offsets = self.line_offsets
+        if not 0 <= line < len(line_offsets):
+            raise IndexError(f"Line {line} is out of range (the file has {len(line_offsets)} lines)")
+        end = line_offsets[line + 1] - 1 if line + 1 < len(line_offsets) else None
+        return self.contents[line_offsets[line]:end]
+
+    @property
+    def content_hash(self) -> str:
+        """
+        The hash of the current contents, which serves as a cache key only.
+        It is computed lazily and recomputed only if the version of the buffer has changed
+        (i.e. if the contents were edited) since the last computation.
+
+        The contents are hashed in chunks of HASH_CHUNK_SIZE characters with blake2b (considerably faster than md5),
+        and the hash is the digest of the concatenated chunk digests. Upon recomputation, the digests of all chunks that
+        precede the first edit are reused, and we never hold a full encoded copy of a large file in memory.
+        """
+        if self._content_hash is None or self._content_hash_version != self.version:
+            contents = self.contents
+            first_dirty_chunk = min(self._first_dirty_index // self.HASH_CHUNK_SIZE, len(self._chunk_digests))
+            chunk_digests = self._chunk_digests[:first_dirty_chunk]
+            for i in range(first_dirty_chunk * self.HASH_CHUNK_SIZE, len(contents), self.HASH_CHUNK_SIZE):
+                chunk_digests.append(self._compute_chunk_digest(contents[i : i + self.HASH_CHUNK_SIZE]))
+            self._chunk_digests = chunk_digests
+            self._first_dirty_index = len(contents)
+            self._content_hash = hashlib.blake2b(b"".join(chunk_digests), digest_size=16).hexdigest()
+            self._content_hash_version = self.version
+        return self._content_hash
+
+    @staticmethod
+    def _compute_chunk_digest(chunk: str) -> bytes:
+        return hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).digest()
+
+    def get_index_from_line_col(self, line: int, col: int) -> int:
+        """
+        Returns the index in the contents of the given zero-indexed line and column number
+        """
+        return self._text.get_index_from_line_col(line, col)
+
+    def insert_text(self, index: int, text: str) -> None:
+        """
+        Inserts the given text at the given index of the contents (the version is not changed).
+        """
+        self._text.insert(index, text)
+        self._first_dirty_index = min(self._first_dirty_index, index)
+        self._lines = None
+        self._line_offsets = None
+
+    def delete_text(self, start_index: int, end_index: int) -> str:
+        """
+        Deletes the text between the given indices of the contents and returns it (the version is not changed).
+        """
+        self._first_dirty_index = min(self._first_dirty_index, start_index)
+        self._lines = None
+        self._line_offsets = None
+        return self._text.delete(start_index, end_index)
 
 
 class LanguageServer:
@@ -82,6 +237,20 @@ class LanguageServer:
     The LanguageServer class provides a language agnostic interface to the Language Server Protocol.
     It is used to communicate with Language Servers of different programming languages.
     """
+
+    DOCUMENT_SYMBOLS_CACHE_VERSION = 1
+    """
+    Version of the format of the document symbols cache entries; entries with a different version are ignored.
+    Must be increased whenever the format of the entries (or of the cached results) changes.
+    """
+    _DOCUMENT_SYMBOLS_CACHE_HEADER = (DOCUMENT_SYMBOLS_CACHE_VERSION, LSPFileBuffer.CONTENT_HASH_ALGORITHM)
+    """
+    The header of each document symbols cache entry. Entries with a different header are ignored, i.e. also
+    entries whose content hashes were computed with a different algorithm (and would thus never match).
+    """
+    CONTAINING_SYMBOL_CACHE_SIZE = 4096
+    """The maximum number of results of request_containing_symbol that are kept in memory"""
+
     @classmethod
     def create(cls, config: MultilspyConfig, logger: MultilspyLogger, repository_root_path: str) -> "LanguageServer":
         """
@@ -96,6 +265,13 @@ class LanguageServer:
 
         :return LanguageServer: A language specific LanguageServer instance.
         """
+        if config.server_pool_size > 1:
+            from multilspy.language_server_pool import LanguageServerPool
+
+            member_config = dataclasses.replace(config, server_pool_size=1)
+            members = [cls.create(member_config, logger, repository_root_path) for _ in range(config.server_pool_size)]
+            return LanguageServerPool(members, config, logger, repository_root_path)
+
         if config.code_language == Language.PYTHON:
             from multilspy.language_servers.pyright_language_server.pyright_server import (
                 PyrightServer,
@@ -171,6 +347,10 @@ class LanguageServer:
         self.logger = logger
         self.server_started = False
         self.repository_root_path: str = repository_root_path
+        # normalized root path with a trailing separator, see _to_relative_path
+        self._root_prefix: str = os.path.join(os.path.abspath(repository_root_path), "")
+        # normalized root path (as given, i.e. not necessarily absolute), to which relative paths are joined
+        self._root_path: str = str(PurePath(repository_root_path))
         self.completions_available = asyncio.Event()
 
         if config.trace_lsp_communication:
@@ -189,12 +369,36 @@ class LanguageServer:
 
         self.language_id = language_id
         self.open_file_buffers: Dict[str, LSPFileBuffer] = {}
+        self._pending_content_changes: Dict[str, List[LSPTypes.TextDocumentContentChangeEvent]] = {}
+        """Maps URIs of files that are within a batch_edits context to the content changes that have yet to be sent"""
+        # memoized file URIs by relative path, see _rel_to_uri
+        self._uri_cache: Dict[str, str] = {}
+        # URI of the repository root with a trailing slash (None if the root path is not absolute), see _rel_to_uri
+        self._root_uri: Optional[str] = None
+        if os.path.isabs(repository_root_path):
+            self._root_uri = pathlib.Path(repository_root_path).as_uri()
+            if not self._root_uri.endswith("/"):
+                self._root_uri += "/"
         
         # --------------------------------- MODIFICATIONS BY ORAIOS ---------------------------------
         self._document_symbols_cache:  dict[str, Tuple[str, Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]]] = {}
         """Maps file paths to a tuple of (file_content_hash, result_of_request_document_symbols)"""
+        self._document_symbols_file_stats: dict[str, Tuple[int, int]] = {}
+        """Maps the keys of the document symbols cache to the (mtime_ns, size) of the file at the time its cache entry was validated"""
+        self._containing_symbol_candidates: Dict[str, Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation], List[int], List[int]]] = {}
+        """Maps file paths to the document symbols most recently used by request_containing_symbol and the candidate containers derived from them"""
+        self._containing_symbol_cache: OrderedDict[Tuple[str, Union[str, Tuple[int, int]], int, Optional[int], bool], Optional[multilspy_types.UnifiedSymbolInformation]] = OrderedDict()
+        """
+        LRU cache mapping (file path, file version, line, column, strict) to the result of request_containing_symbol (without body),
+        where the file version is the (mtime_ns, size) of the file on disk if it has no in-memory edits, and the content hash
+        of the open buffer otherwise. As the version is part of the key, entries for previous versions of a file are never hit
+        again (and are eventually evicted).
+        """
+        self._cache_has_changed: bool = False
+        """Whether the document symbols cache was changed since it was last loaded or saved"""
+        self._dirty_cache_keys: set[str] = set()
+        """The keys of the document symbols cache entries that were changed since the cache was last loaded or saved"""
         self.load_cache()
-        self._cache_has_changed = bool
         self.language = Language(language_id)
 
     @asynccontextmanager
@@ -218,6 +422,40 @@ class LanguageServer:
 
     # TODO: Add support for more LSP features
 
+    def _rel_to_uri(self, relative_file_path: str) -> str:
+        """
+        Returns the file URI of the given path relative to the repository root.
+        The result is memoized per instance, since building it involves path normalization and percent-encoding.
+
+        :param relative_file_path: The relative path of the file.
+        """
+        uri = self._uri_cache.get(relative_file_path)
+        if uri is None:
+            if self._root_uri is not None and not os.path.isabs(relative_file_path):
+                # append the (normalized, percent-encoded) relative path to the root URI, which is equivalent to
+                # converting the joined path but avoids building and converting another path object
+                posix_relative_path = PurePath(relative_file_path).as_posix()
+                if posix_relative_path == ".":
+                    uri = pathlib.Path(self.repository_root_path).as_uri()
+                else:
+                    uri = self._root_uri + urllib.parse.quote(posix_relative_path, safe="/")
+            else:
+                uri = pathlib.Path(os.fspath(PurePath(self.repository_root_path, relative_file_path))).as_uri()
+            self._uri_cache[relative_file_path] = uri
+        return uri
+
+    def _to_relative_path(self, absolute_path: str) -> str:
+        """
+        Returns the given (normalized) absolute path relative to the repository root.
+        Paths within the repository only require stripping the root prefix; other paths are handled by os.path.relpath
+        (which may raise ValueError, e.g. for paths on another drive on Windows).
+
+        :param absolute_path: The absolute path to convert.
+        """
+        if absolute_path.startswith(self._root_prefix):
+            return absolute_path[len(self._root_prefix):]
+        return os.path.relpath(absolute_path, self.repository_root_path)
+
     @contextmanager
     def open_file(self, relative_file_path: str) -> Iterator[LSPFileBuffer]:
         """
@@ -232,8 +470,8 @@ class LanguageServer:
             )
             raise MultilspyException("Language Server not started")
 
-        absolute_file_path = str(PurePath(self.repository_root_path, relative_file_path))
-        uri = pathlib.Path(absolute_file_path).as_uri()
+        absolute_file_path = os.path.join(self._root_path, relative_file_path)
+        uri = self._rel_to_uri(relative_file_path)
 
         if uri in self.open_file_buffers:
             assert self.open_file_buffers[uri].uri == uri
@@ -290,34 +528,24 @@ class LanguageServer:
             )
             raise MultilspyException("Language Server not started")
 
-        absolute_file_path = str(PurePath(self.repository_root_path, relative_file_path))
-        uri = pathlib.Path(absolute_file_path).as_uri()
+        uri = self._rel_to_uri(relative_file_path)
 
         # Ensure the file is open
         assert uri in self.open_file_buffers
 
         file_buffer = self.open_file_buffers[uri]
         file_buffer.version += 1
-        change_index = TextUtils.get_index_from_line_col(file_buffer.contents, line, column)
-        file_buffer.contents = (
-            file_buffer.contents[:change_index] + text_to_be_inserted + file_buffer.contents[change_index:]
-        )
-        self.server.notify.did_change_text_document(
+        change_index = file_buffer.get_index_from_line_col(line, column)
+        file_buffer.insert_text(change_index, text_to_be_inserted)
+        self._notify_content_change(
+            file_buffer,
             {
-                LSPConstants.TEXT_DOCUMENT: {
-                    LSPConstants.VERSION: file_buffer.version,
-                    LSPConstants.URI: file_buffer.uri,
+                LSPConstants.RANGE: {
+                    "start": {"line": line, "character": column},
+                    "end": {"line": line, "character": column},
                 },
-                LSPConstants.CONTENT_CHANGES: [
-                    {
-                        LSPConstants.RANGE: {
-                            "start": {"line": line, "character": column},
-                            "end": {"line": line, "character": column},
-                        },
-                        "text": text_to_be_inserted,
-                    }
-                ],
-            }
+                "text": text_to_be_inserted,
+            },
         )
         new_l, new_c = TextUtils.get_updated_position_from_line_and_column_and_edit(line, column, text_to_be_inserted)
         return multilspy_types.Position(line=new_l, character=new_c)
@@ -338,28 +566,67 @@ class LanguageServer:
             )
             raise MultilspyException("Language Server not started")
 
-        absolute_file_path = str(PurePath(self.repository_root_path, relative_file_path))
-        uri = pathlib.Path(absolute_file_path).as_uri()
+        uri = self._rel_to_uri(relative_file_path)
 
         # Ensure the file is open
         assert uri in self.open_file_buffers
 
         file_buffer = self.open_file_buffers[uri]
         file_buffer.version += 1
-        del_start_idx = TextUtils.get_index_from_line_col(file_buffer.contents, start["line"], start["character"])
-        del_end_idx = TextUtils.get_index_from_line_col(file_buffer.contents, end["line"], end["character"])
-        deleted_text = file_buffer.contents[del_start_idx:del_end_idx]
-        file_buffer.contents = file_buffer.contents[:del_start_idx] + file_buffer.contents[del_end_idx:]
+        del_start_idx = file_buffer.get_index_from_line_col(start["line"], start["character"])
+        del_end_idx = file_buffer.get_index_from_line_col(end["line"], end["character"])
+        deleted_text = file_buffer.delete_text(del_start_idx, del_end_idx)
+        self._notify_content_change(file_buffer, {LSPConstants.RANGE: {"start": start, "end": end}, "text": ""})
+        return deleted_text
+
+    def _notify_content_change(self, file_buffer: LSPFileBuffer, content_change: LSPTypes.TextDocumentContentChangeEvent) -> None:
+        """
+        Notifies the Language Server of the given change to the given (already updated) file buffer.
+        Within a batch_edits context for the file, the change is only recorded and sent along with the other changes of the batch.
+        """
+        pending_changes = self._pending_content_changes.get(file_buffer.uri)
+        if pending_changes is not None:
+            pending_changes.append(content_change)
+        else:
+            self._send_content_changes(file_buffer, [content_change])
+
+    def _send_content_changes(self, file_buffer: LSPFileBuffer, content_changes: List[LSPTypes.TextDocumentContentChangeEvent]) -> None:
         self.server.notify.did_change_text_document(
             {
                 LSPConstants.TEXT_DOCUMENT: {
                     LSPConstants.VERSION: file_buffer.version,
                     LSPConstants.URI: file_buffer.uri,
                 },
-                LSPConstants.CONTENT_CHANGES: [{LSPConstants.RANGE: {"start": start, "end": end}, "text": ""}],
+                LSPConstants.CONTENT_CHANGES: content_changes,
             }
         )
-        return deleted_text
+
+    @contextmanager
+    def batch_edits(self, relative_file_path: str) -> Iterator[None]:
+        """
+        Within this context, the edits made to the given file via insert_text_at_position and delete_text_between_positions
+        are not sent to the Language Server individually but as a single didChange notification upon exiting the context.
+        The file must be open for the entire duration of the context.
+
+        :param relative_file_path: The relative path of the file that is to be edited.
+        """
+        uri = self._rel_to_uri(relative_file_path)
+
+        # Ensure the file is open
+        assert uri in self.open_file_buffers
+
+        if uri in self._pending_content_changes:
+            # nested batch for the same file: the outermost context sends the changes
+            yield
+            return
+
+        self._pending_content_changes[uri] = []
+        try:
+            yield
+        finally:
+            content_changes = self._pending_content_changes.pop(uri)
+            if content_changes:
+                self._send_content_changes(self.open_file_buffers[uri], content_changes)
 
     async def request_definition(
         self, relative_file_path: str, line: int, column: int
@@ -387,9 +654,7 @@ class LanguageServer:
             response = await self.server.send.definition(
                 {
                     LSPConstants.TEXT_DOCUMENT: {
-                        LSPConstants.URI: pathlib.Path(
-                            str(PurePath(self.repository_root_path, relative_file_path))
-                        ).as_uri()
+                        LSPConstants.URI: self._rel_to_uri(relative_file_path)
                     },
                     LSPConstants.POSITION: {
                         LSPConstants.LINE: line,
@@ -401,36 +666,35 @@ class LanguageServer:
         ret: List[multilspy_types.Location] = []
         if isinstance(response, list):
             # response is either of type Location[] or LocationLink[]
+            uri_key, range_key = LSPConstants.URI, LSPConstants.RANGE
             for item in response:
-                assert isinstance(item, dict)
-                if LSPConstants.URI in item and LSPConstants.RANGE in item:
-                    new_item: multilspy_types.Location = {}
-                    new_item.update(item)
-                    new_item["absolutePath"] = PathUtils.uri_to_path(new_item["uri"])
+                if uri_key in item and range_key in item:
+                    absolute_path = PathUtils.uri_to_path(item[uri_key])
                     try:
-                        new_item["relativePath"] = str(
-                            PurePath(os.path.relpath(new_item["absolutePath"], self.repository_root_path))
-                        )
+                        relative_path = str(PurePath(self._to_relative_path(absolute_path)))
                     except:
-                        new_item["relativePath"] = str(new_item["absolutePath"])
-                    ret.append(multilspy_types.Location(new_item))
+                        relative_path = absolute_path
+                    ret.append(cast(multilspy_types.Location, {**item, "absolutePath": absolute_path, "relativePath": relative_path}))
                 elif (
                     LSPConstants.ORIGIN_SELECTION_RANGE in item
                     and LSPConstants.TARGET_URI in item
                     and LSPConstants.TARGET_RANGE in item
                     and LSPConstants.TARGET_SELECTION_RANGE in item
                 ):
-                    new_item: multilspy_types.Location = {}
-                    new_item["uri"] = item[LSPConstants.TARGET_URI]
-                    new_item["absolutePath"] = PathUtils.uri_to_path(new_item["uri"])
+                    uri = item[LSPConstants.TARGET_URI]
+                    absolute_path = PathUtils.uri_to_path(uri)
                     try:
-                        new_item["relativePath"] = str(
-                            PurePath(os.path.relpath(new_item["absolutePath"], self.repository_root_path))
-                        )
+                        relative_path = str(PurePath(self._to_relative_path(absolute_path)))
                     except:
-                        new_item["relativePath"] = str(new_item["absolutePath"])
-                    new_item["range"] = item[LSPConstants.TARGET_SELECTION_RANGE]
-                    ret.append(multilspy_types.Location(**new_item))
+                        relative_path = absolute_path
+                    ret.append(
+                        multilspy_types.Location(
+                            uri=uri,
+                            absolutePath=absolute_path,
+                            relativePath=relative_path,
+                            range=item[LSPConstants.TARGET_SELECTION_RANGE],
+                        )
+                    )
                 else:
                     assert False, f"Unexpected response from Language Server: {item}"
         elif isinstance(response, dict):
@@ -438,13 +702,9 @@ class LanguageServer:
             assert LSPConstants.URI in response
             assert LSPConstants.RANGE in response
 
-            new_item: multilspy_types.Location = {}
-            new_item.update(response)
-            new_item["absolutePath"] = PathUtils.uri_to_path(new_item["uri"])
-            new_item["relativePath"] = str(
-                PurePath(os.path.relpath(new_item["absolutePath"], self.repository_root_path))
-            )
-            ret.append(multilspy_types.Location(**new_item))
+            absolute_path = PathUtils.uri_to_path(response["uri"])
+            relative_path = str(PurePath(self._to_relative_path(absolute_path)))
+            ret.append(cast(multilspy_types.Location, {**response, "absolutePath": absolute_path, "relativePath": relative_path}))
         elif response is None:
             # Some language servers return None when they cannot find a definition
             # This is expected for certain symbol types like generics or types with incomplete information
@@ -483,27 +743,22 @@ class LanguageServer:
             response = await self.server.send.references(
                 {
                     "context": {"includeDeclaration": False},
-                    "textDocument": {
-                        "uri": pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()
-                    },
+                    "textDocument": {"uri": self._rel_to_uri(relative_file_path)},
                     "position": {"line": line, "character": column},
                 }
             )
 
         ret: List[multilspy_types.Location] = []
         assert isinstance(response, list)
-        for item in response:
-            assert isinstance(item, dict)
-            assert LSPConstants.URI in item
-            assert LSPConstants.RANGE in item
-
-            new_item: multilspy_types.Location = {}
-            new_item.update(item)
-            new_item["absolutePath"] = PathUtils.uri_to_path(new_item["uri"])
-            new_item["relativePath"] = str(
-                PurePath(os.path.relpath(new_item["absolutePath"], self.repository_root_path))
-            )
-            ret.append(multilspy_types.Location(**new_item))
+        # check the shape of the response once rather than for every item
+        if response:
+            assert isinstance(response[0], dict) and LSPConstants.URI in response[0] and LSPConstants.RANGE in response[0]
+
+        # convert all URIs in one pass rather than parsing each one separately
+        uri_key = LSPConstants.URI
+        paths = PathUtils.uris_to_relpaths([item[uri_key] for item in response], self.repository_root_path)
+        for item, (absolute_path, relative_path) in zip(response, paths):
+            ret.append(cast(multilspy_types.Location, {**item, "absolutePath": absolute_path, "relativePath": relative_path}))
 
         return ret
     
@@ -576,9 +831,7 @@ class LanguageServer:
         :return List[multilspy_types.CompletionItem]: A list of completions
         """
         with self.open_file(relative_file_path):
-            open_file_buffer = self.open_file_buffers[
-                pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()
-            ]
+            open_file_buffer = self.open_file_buffers[self._rel_to_uri(relative_file_path)]
             completion_params: LSPTypes.CompletionParams = {
                 "position": {"line": line, "character": column},
                 "textDocument": {"uri": open_file_buffer.uri},
@@ -586,15 +839,29 @@ class LanguageServer:
             }
             response: Union[List[LSPTypes.CompletionItem], LSPTypes.CompletionList, None] = None
 
+            # the server may initially return no or incomplete results; we retry with exponential backoff (bounded
+            # by max_retries) and give up early once the number of items has stopped changing
+            max_retries = 30
             num_retries = 0
-            while response is None or (response["isIncomplete"] and num_retries < 30):
-                await self.completions_available.wait()
+            num_stable_retries = 0
+            prev_item_count = None
+            await self.completions_available.wait()
+            while True:
                 response: Union[
                     List[LSPTypes.CompletionItem], LSPTypes.CompletionList, None
                 ] = await self.server.send.completion(completion_params)
                 if isinstance(response, list):
                     response = {"items": response, "isIncomplete": False}
                 num_retries += 1
+                if (response is not None and not response["isIncomplete"]) or num_retries >= max_retries:
+                    break
+                if response is not None:
+                    item_count = len(response["items"])
+                    num_stable_retries = num_stable_retries + 1 if item_count == prev_item_count else 0
+                    if num_stable_retries >= 2:
+                        break
+                    prev_item_count = item_count
+                await asyncio.sleep(min(0.01 * 2 ** (num_retries - 1), 0.2))
 
             # TODO: Understand how to appropriately handle `isIncomplete`
             if response is None or (response["isIncomplete"] and not(allow_incomplete)):
@@ -609,6 +876,8 @@ class LanguageServer:
             items = [item for item in response if item["kind"] != LSPTypes.CompletionItemKind.Keyword]
 
             completions_list: List[multilspy_types.CompletionItem] = []
+            # keys of the completions collected so far, used to drop duplicates (keeping the first occurrence)
+            seen_completion_keys: set[Tuple[str, int, Optional[str]]] = set()
 
             for item in items:
                 assert "insertText" in item or "textEdit" in item
@@ -648,13 +917,30 @@ class LanguageServer:
                 else:
                     assert False
 
-                completion_item = multilspy_types.CompletionItem(**completion_item)
-                completions_list.append(completion_item)
+                completion_key = (completion_item["completionText"], completion_item["kind"], completion_item.get("detail"))
+                if completion_key in seen_completion_keys:
+                    continue
+                seen_completion_keys.add(completion_key)
+                completions_list.append(multilspy_types.CompletionItem(**completion_item))
+
+            return completions_list
 
-            return [
-                json.loads(json_repr)
-                for json_repr in set([json.dumps(item, sort_keys=True) for item in completions_list])
-            ]
+    def _get_file_stat(self, relative_file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Returns the modification time (in nanoseconds) and the size of the given file, or None if the file cannot be accessed.
+        """
+        try:
+            stat_result = os.stat(os.path.join(self.repository_root_path, relative_file_path))
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def _has_unsaved_edits(self, relative_file_path: str) -> bool:
+        """
+        Returns whether the given file is open and has been edited in memory (such that its contents may differ from the file on disk).
+        """
+        file_buffer = self.open_file_buffers.get(self._rel_to_uri(relative_file_path))
+        return file_buffer is not None and file_buffer.version > 0
 
     async def request_document_symbols(self, relative_file_path: str, include_body: bool = False) -> Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]:
         """
@@ -671,30 +957,48 @@ class LanguageServer:
         # TODO: it's kinda dumb to not use the cache if include_body is False after include_body was True once
         #   Should be fixed in the future, it's a small performance optimization
         cache_key = f"{relative_file_path}-{include_body}"
+        file_hash_and_result = self._get_cached_document_symbols(cache_key)
+        # If the file was not modified on disk since the cache entry was last validated (and is not being edited in memory),
+        # we can return the cached result without opening the file (which requires reading and hashing it and notifying the server)
+        file_stat = self._get_file_stat(relative_file_path)
+        if (
+            file_hash_and_result is not None
+            and file_stat is not None
+            and self._document_symbols_file_stats.get(cache_key) == file_stat
+            and not self._has_unsaved_edits(relative_file_path)
+        ):
+            self.logger.log(f"Returning cached document symbols for {relative_file_path} (file unchanged on disk)", logging.DEBUG)
+            return file_hash_and_result[1]
+
         with self.open_file(relative_file_path) as file_data:
-            file_hash_and_result = self._document_symbols_cache.get(cache_key)
+            # the stat can only be associated with the buffer's contents if they were just read from disk
+            if file_data.ref_count > 1 or file_data.version > 0:
+                file_stat = None
             if file_hash_and_result is not None:
                 file_hash, result = file_hash_and_result
                 if file_hash == file_data.content_hash:
                     self.logger.log(f"Returning cached document symbols for {relative_file_path}", logging.DEBUG)
+                    if file_stat is not None and self._document_symbols_file_stats.get(cache_key) != file_stat:
+                        self._document_symbols_file_stats[cache_key] = file_stat
+                        self._dirty_cache_keys.add(cache_key)
+                        self._cache_has_changed = True
                     return result
                 else:
                     self.logger.log(f"Content for {relative_file_path} has changed. Overwriting cache", logging.INFO)
             
             
             response = await self.server.send.document_symbol(
-                {
-                    "textDocument": {
-                        "uri": pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()
-                    }
-                }
+                {"textDocument": {"uri": self._rel_to_uri(relative_file_path)}}
             )
             
+        # values used for every symbol, which are looked up/computed only once
+        children_key = LSPConstants.CHILDREN
+        absolute_path = os.path.join(self.repository_root_path, relative_file_path)
+        uri = self._rel_to_uri(relative_file_path)
+
         def turn_item_into_symbol_with_children(item: GenericDocumentSymbol):
             item = cast(multilspy_types.UnifiedSymbolInformation, item)
             if "location" not in item:
-                absolute_path = os.path.join(self.repository_root_path, relative_file_path)
-                uri = pathlib.Path(absolute_path).as_uri()
                 assert "range" in item
                 tree_location = multilspy_types.Location(
                     uri=uri,
@@ -705,10 +1009,13 @@ class LanguageServer:
                 item['location'] = tree_location
             if include_body:
                 item['body'] = self.retrieve_symbol_body(item)
-            item[LSPConstants.CHILDREN] = item.get(LSPConstants.CHILDREN, [])
+            item[children_key] = item.get(children_key, [])
         
         flat_all_symbol_list: List[multilspy_types.UnifiedSymbolInformation] = []
         assert isinstance(response, list)
+        # check the shape of the response once rather than for every item
+        if response:
+            assert isinstance(response[0], dict) and LSPConstants.NAME in response[0] and LSPConstants.KIND in response[0]
         root_nodes: List[multilspy_types.UnifiedSymbolInformation] = []
         for item in response:
             if "range" not in item and "location" not in item:
@@ -718,31 +1025,20 @@ class LanguageServer:
             turn_item_into_symbol_with_children(item)
             item = cast(multilspy_types.UnifiedSymbolInformation, item)
             root_nodes.append(item)
-            assert isinstance(item, dict)
-            assert LSPConstants.NAME in item
-            assert LSPConstants.KIND in item
 
-            if LSPConstants.CHILDREN in item:
-                # TODO: l_tree should be a list of TreeRepr. Define the following function to return TreeRepr as well
-                
-                def visit_tree_nodes_and_build_tree_repr(node: GenericDocumentSymbol) -> List[multilspy_types.UnifiedSymbolInformation]:
-                    node = cast(multilspy_types.UnifiedSymbolInformation, node)
-                    l: List[multilspy_types.UnifiedSymbolInformation] = []
-                    turn_item_into_symbol_with_children(node)
-                    assert LSPConstants.CHILDREN in node
-                    children = node[LSPConstants.CHILDREN]
-                    l.append(node)
-                    for child in children:
-                        l.extend(visit_tree_nodes_and_build_tree_repr(child))
-                    return l
-                
-                flat_all_symbol_list.extend(visit_tree_nodes_and_build_tree_repr(item))
+            if children_key in item:
+                flat_all_symbol_list.extend(_flatten_document_symbols(item, turn_item_into_symbol_with_children))
             else:
                 flat_all_symbol_list.append(multilspy_types.UnifiedSymbolInformation(**item))
 
         result = flat_all_symbol_list, root_nodes
         self.logger.log(f"Caching document symbols for {relative_file_path}", logging.DEBUG)
         self._document_symbols_cache[cache_key] = (file_data.content_hash, result)
+        if file_stat is not None:
+            self._document_symbols_file_stats[cache_key] = file_stat
+        else:
+            self._document_symbols_file_stats.pop(cache_key, None)
+        self._dirty_cache_keys.add(cache_key)
         self._cache_has_changed = True
         return result
     
@@ -831,14 +1127,14 @@ class LanguageServer:
                     # Create file symbol
                     file_rel_path = str(Path(abs_item_path).resolve().relative_to(self.repository_root_path))
                     with self.open_file(file_rel_path) as file_data:
-                        fileRange = self._get_range_from_file_content(file_data.contents)
+                        fileRange = self._get_file_range(file_data)
                     file_symbol = multilspy_types.UnifiedSymbolInformation( # type: ignore
                         name=os.path.splitext(item)[0],
                         kind=multilspy_types.SymbolKind.File,
                         range=fileRange,
                         selectionRange=fileRange,
                         location=multilspy_types.Location(
-                            uri=str(pathlib.Path(abs_item_path).as_uri()),
+                            uri=self._rel_to_uri(file_rel_path),
                             range=fileRange,
                             absolutePath=str(abs_item_path),
                             relativePath=str(Path(abs_item_path).resolve().relative_to(self.repository_root_path)),
@@ -855,11 +1151,11 @@ class LanguageServer:
         return await process_directory(start_path)
 
     @staticmethod
-    def _get_range_from_file_content(file_content: str) -> multilspy_types.Range:
+    def _get_file_range(file_data: LSPFileBuffer) -> multilspy_types.Range:
         """
-        Get the range for the given file.
+        Get the range for the given file (using the cached lines of the buffer rather than splitting its contents).
         """
-        lines = file_content.split("\n")
+        lines = file_data.lines
         end_line = len(lines)
         end_column = len(lines[-1])
         return multilspy_types.Range(
@@ -931,9 +1227,7 @@ class LanguageServer:
         with self.open_file(relative_file_path):
             response = await self.server.send.hover(
                 {
-                    "textDocument": {
-                        "uri": pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()
-                    },
+                    "textDocument": {"uri": self._rel_to_uri(relative_file_path)},
                     "position": {
                         "line": line,
                         "character": column,
@@ -994,20 +1288,19 @@ class LanguageServer:
         # seems to work in all these language servers
         # walk through all children recursively, find all symbols of type Module and collect their relative paths
         roots = await self.request_full_symbol_tree()
-        paths = [] 
-        def collect_module_files(symbol):
-            if symbol["kind"] == multilspy_types.SymbolKind.File:
+        # dict preserves the order in which the files are found while dropping duplicates
+        paths: Dict[str, None] = {}
+        stack = list(reversed(roots))
+        while stack:
+            symbol = stack.pop()
+            kind = symbol["kind"]
+            if kind == multilspy_types.SymbolKind.File:
                 assert "location" in symbol
-                paths.append(symbol["location"]["relativePath"])
-            
-            elif symbol["kind"] == multilspy_types.SymbolKind.Package:
-                for child in symbol["children"]:
-                    collect_module_files(child)
-        
-        for root in roots:
-            collect_module_files(root)
-        
-        return paths
+                paths[symbol["location"]["relativePath"]] = None
+            elif kind == multilspy_types.SymbolKind.Package:
+                stack.extend(reversed(symbol["children"]))
+
+        return list(paths)
     
     
     async def search_files_for_pattern(
@@ -1099,110 +1392,165 @@ class LanguageServer:
         if not references:
             return []
 
-        # For each reference, find the containing symbol
+        with ExitStack() as open_files_stack:
+            # Phase 1: find the containing symbols of all references concurrently (with each referencing file being opened once)
+            ref_positions = [
+                (ref["relativePath"], ref["range"]["start"]["line"], ref["range"]["start"]["character"]) for ref in references
+            ]
+            file_data_by_path: Dict[str, LSPFileBuffer] = {}
+            for ref_path, _, _ in ref_positions:
+                if ref_path not in file_data_by_path:
+                    file_data_by_path[ref_path] = open_files_stack.enter_context(self.open_file(ref_path))
+            unique_ref_positions = list(dict.fromkeys(ref_positions))
+            # the symbols of each referencing file are requested only once, even if the file contains many references
+            document_symbols_memo: Dict[str, asyncio.Task] = {}
+            containing_symbols = await asyncio.gather(
+                *(
+                    self._request_containing_symbol(
+                        ref_path, ref_line, ref_col, include_body=include_body, document_symbols_memo=document_symbols_memo
+                    )
+                    for ref_path, ref_line, ref_col in unique_ref_positions
+                )
+            )
+            containing_symbol_by_position = dict(zip(unique_ref_positions, containing_symbols))
+
+            # Phase 2: filter the containing symbols (sequentially, in the order of the references)
+            return await self._filter_referencing_symbols(
+                relative_file_path,
+                references,
+                ref_positions,
+                containing_symbol_by_position,
+                file_data_by_path,
+                document_symbols_memo,
+                include_imports=include_imports,
+                include_self=include_self,
+                include_body=include_body,
+                include_file_symbols=include_file_symbols,
+            )
+
+    async def _filter_referencing_symbols(
+        self,
+        relative_file_path: str,
+        references: List[multilspy_types.Location],
+        ref_positions: List[Tuple[str, int, int]],
+        containing_symbol_by_position: Dict[Tuple[str, int, int], Optional[multilspy_types.UnifiedSymbolInformation]],
+        file_data_by_path: Dict[str, LSPFileBuffer],
+        document_symbols_memo: Dict[str, asyncio.Task],
+        include_imports: bool,
+        include_self: bool,
+        include_body: bool,
+        include_file_symbols: bool,
+    ) -> List[multilspy_types.UnifiedSymbolInformation]:
+        """
+        Turns the containing symbols of the given references into the result of request_referencing_symbols
+        (see there for the meaning of the parameters), applying fallbacks for references without a containing symbol
+        and filtering out self-references and imports.
+        """
         result = []
         incoming_symbol = None
-        for ref in references:
-            ref_path = ref["relativePath"]
-            ref_line = ref["range"]["start"]["line"]
-            ref_col = ref["range"]["start"]["character"]
-
-            with self.open_file(ref_path) as file_data:
-                # Get the containing symbol for this reference
-                containing_symbol = await self.request_containing_symbol(
-                    ref_path, ref_line, ref_col, include_body=include_body
-                )
-                if containing_symbol is None:
-                    # TODO: HORRIBLE HACK! I don't know how to do it better for now...
-                    # THIS IS BOUND TO BREAK IN MANY CASES! IT IS ALSO SPECIFIC TO PYTHON!
-                    # Background:
-                    # When a variable is used to change something, like 
-                    #
-                    # instance = MyClass()
-                    # instance.status = "new status"
-                    #
-                    # we can't find the containing symbol for the reference to `status`
-                    # since there is no container on the line of the reference
-                    # The hack is to try to find a variable symbol in the containing module
-                    # by using the text of the reference to find the variable name (In a very heuristic way)
-                    # and then look for a symbol with that name and kind Variable
-                    ref_text = file_data.contents.split("\n")[ref_line]
-                    if "." in ref_text:   
-                        containing_symbol_name = ref_text.split(".")[0]
-                        all_symbols, _ = await self.request_document_symbols(ref_path)
+        # maps file paths to the variables of the file by name (for the variable hack below), built on demand
+        variables_by_name_by_path: Dict[str, Dict[str, multilspy_types.UnifiedSymbolInformation]] = {}
+        for ref, (ref_path, ref_line, ref_col) in zip(references, ref_positions):
+            file_data = file_data_by_path[ref_path]
+            containing_symbol = containing_symbol_by_position[(ref_path, ref_line, ref_col)]
+            if containing_symbol is None:
+                # TODO: HORRIBLE HACK! I don't know how to do it better for now...
+                # THIS IS BOUND TO BREAK IN MANY CASES! IT IS ALSO SPECIFIC TO PYTHON!
+                # Background:
+                # When a variable is used to change something, like 
+                #
+                # instance = MyClass()
+                # instance.status = "new status"
+                #
+                # we can't find the containing symbol for the reference to `status`
+                # since there is no container on the line of the reference
+                # The hack is to try to find a variable symbol in the containing module
+                # by using the text of the reference to find the variable name (In a very heuristic way)
+                # and then look for a symbol with that name and kind Variable
+                ref_text = file_data.get_line(ref_line).lstrip()
+                dot_index = ref_text.find(".")
+                if dot_index > 0:
+                    containing_symbol_name = ref_text[:dot_index]
+                    variables_by_name = variables_by_name_by_path.get(ref_path)
+                    if variables_by_name is None:
+                        all_symbols, _ = await self._request_document_symbols_memoized(ref_path, document_symbols_memo)
+                        # the first variable of each name takes precedence
+                        variables_by_name = {}
                         for symbol in all_symbols:
-                            if symbol["name"] == containing_symbol_name and symbol["kind"] == multilspy_types.SymbolKind.Variable:
-                                containing_symbol = copy(symbol)
-                                containing_symbol["location"] = ref
-                                containing_symbol["range"] = ref["range"]
-                                break
-
-                # We failed retrieving the symbol, falling back to creating a file symbol
-                if containing_symbol is None and include_file_symbols:
-                    self.logger.log(
-                        f"Could not find containing symbol for {ref_path}:{ref_line}:{ref_col}. Returning file symbol instead",
-                        logging.WARNING
-                    )
-                    fileRange = self._get_range_from_file_content(file_data.contents)
-                    location = multilspy_types.Location(
-                        uri=str(pathlib.Path(os.path.join(self.repository_root_path, ref_path)).as_uri()),
-                        range=fileRange,
-                        absolutePath=str(os.path.join(self.repository_root_path, ref_path)),
-                        relativePath=ref_path,
-                    )
-                    name = os.path.splitext(os.path.basename(ref_path))[0]
-
-                    if include_body:
-                        body = self.retrieve_full_file_content(ref_path)
-                    else:
-                        body = ""
+                            if symbol["kind"] == multilspy_types.SymbolKind.Variable:
+                                variables_by_name.setdefault(symbol["name"], symbol)
+                        variables_by_name_by_path[ref_path] = variables_by_name
+                    symbol = variables_by_name.get(containing_symbol_name)
+                    if symbol is not None:
+                        containing_symbol = {**symbol, "location": ref, "range": ref["range"]}
+
+            # We failed retrieving the symbol, falling back to creating a file symbol
+            if containing_symbol is None and include_file_symbols:
+                self.logger.log(
+                    f"Could not find containing symbol for {ref_path}:{ref_line}:{ref_col}. Returning file symbol instead",
+                    logging.WARNING
+                )
+                fileRange = self._get_file_range(file_data)
+                location = multilspy_types.Location(
+                    uri=self._rel_to_uri(ref_path),
+                    range=fileRange,
+                    absolutePath=str(os.path.join(self.repository_root_path, ref_path)),
+                    relativePath=ref_path,
+                )
+                name = os.path.splitext(os.path.basename(ref_path))[0]
 
-                    containing_symbol = multilspy_types.UnifiedSymbolInformation(
-                        kind=multilspy_types.SymbolKind.File,
-                        range=fileRange,
-                        selectionRange=fileRange,
-                        location=location,
-                        name=name,
-                        children=[],
-                        body=body,
-                    )
-                if containing_symbol is None or not include_file_symbols and containing_symbol["kind"] == multilspy_types.SymbolKind.File:
+                if include_body:
+                    # the file is held open for the entire request, so we need not open it again
+                    body = file_data.contents
+                else:
+                    body = ""
+
+                containing_symbol = multilspy_types.UnifiedSymbolInformation(
+                    kind=multilspy_types.SymbolKind.File,
+                    range=fileRange,
+                    selectionRange=fileRange,
+                    location=location,
+                    name=name,
+                    children=[],
+                    body=body,
+                )
+            if containing_symbol is None or not include_file_symbols and containing_symbol["kind"] == multilspy_types.SymbolKind.File:
+                continue
+            
+            assert "location" in containing_symbol
+            assert "selectionRange" in containing_symbol
+
+            # Checking for self-reference
+            if (
+                containing_symbol["location"]["relativePath"] == relative_file_path
+                and containing_symbol["selectionRange"]["start"]["line"] == ref_line
+                and containing_symbol["selectionRange"]["start"]["character"] == ref_col
+            ):
+                incoming_symbol = containing_symbol
+                if include_self:
+                    result.append(containing_symbol)
                     continue
-                
-                assert "location" in containing_symbol
-                assert "selectionRange" in containing_symbol
-
-                # Checking for self-reference
-                if (
-                    containing_symbol["location"]["relativePath"] == relative_file_path
-                    and containing_symbol["selectionRange"]["start"]["line"] == ref_line
-                    and containing_symbol["selectionRange"]["start"]["character"] == ref_col
-                ):
-                    incoming_symbol = containing_symbol
-                    if include_self:
-                        result.append(containing_symbol)
-                        continue
-                    else:
-                        self.logger.log(f"Found self-reference for {incoming_symbol['name']}, skipping it since {include_self=}", logging.DEBUG)
-                        continue
-                
-                # checking whether reference is an import
-                # This is neither really safe nor elegant, but if we don't do it,
-                # there is no way to distinguish between definitions and imports as import is not a symbol-type
-                # and we get the type referenced symbol resulting from imports...
-                if (not include_imports \
-                    and incoming_symbol is not None \
-                    and containing_symbol["name"] == incoming_symbol["name"] \
-                    and containing_symbol["kind"] == incoming_symbol["kind"] \
-                ):
-                    self.logger.log(
-                        f"Found import of referenced symbol {incoming_symbol['name']}" 
-                        f"in {containing_symbol['location']['relativePath']}, skipping",
-                        logging.DEBUG
-                    )
+                else:
+                    self.logger.log(f"Found self-reference for {incoming_symbol['name']}, skipping it since {include_self=}", logging.DEBUG)
                     continue
-                
-                result.append(containing_symbol)
+            
+            # checking whether reference is an import
+            # This is neither really safe nor elegant, but if we don't do it,
+            # there is no way to distinguish between definitions and imports as import is not a symbol-type
+            # and we get the type referenced symbol resulting from imports...
+            if (not include_imports \
+                and incoming_symbol is not None \
+                and containing_symbol["name"] == incoming_symbol["name"] \
+                and containing_symbol["kind"] == incoming_symbol["kind"] \
+            ):
+                self.logger.log(
+                    f"Found import of referenced symbol {incoming_symbol['name']}" 
+                    f"in {containing_symbol['location']['relativePath']}, skipping",
+                    logging.DEBUG
+                )
+                continue
+            
+            result.append(containing_symbol)
 
         return result
     
@@ -1240,24 +1588,138 @@ class LanguageServer:
         :param include_body: Whether to include the body of the symbol in the result.
         :return: The container symbol (if found) or None.
         """
-        # checking if the line is empty, unfortunately ugly and duplicating code, but I don't want to refactor
-        with self.open_file(relative_file_path):
-            absolute_file_path = str(
-                PurePath(self.repository_root_path, relative_file_path)
-            )
-            content = FileUtils.read_file(self.logger, absolute_file_path)
-            if content.split("\n")[line].strip() == "":
-                self.logger.log(
-                    f"Passing empty lines to request_container_symbol is currently not supported, {relative_file_path=}, {line=}",
-                    logging.ERROR,
-                )
-                return None
+        return await self._request_containing_symbol(relative_file_path, line, column, strict=strict, include_body=include_body)
+
+    async def _request_document_symbols_memoized(
+        self, relative_file_path: str, document_symbols_memo: Optional[Dict[str, asyncio.Task]]
+    ) -> Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]:
+        """
+        Returns the result of request_document_symbols for the given file (without bodies).
+
+        :param relative_file_path: The relative path of the file.
+        :param document_symbols_memo: if not None, a memo mapping file paths to (tasks computing) document symbols that
+            is shared by the requests of a single higher-level operation, such that the symbols of each file are
+            requested only once, even if they are needed by several concurrent requests.
+        """
+        if document_symbols_memo is None:
+            return await self.request_document_symbols(relative_file_path)
+        task = document_symbols_memo.get(relative_file_path)
+        if task is None:
+            task = asyncio.ensure_future(self.request_document_symbols(relative_file_path))
+            document_symbols_memo[relative_file_path] = task
+        return await task
+
+    async def _request_containing_symbol(
+        self,
+        relative_file_path: str,
+        line: int,
+        column: Optional[int] = None,
+        strict: bool = False,
+        include_body: bool = False,
+        document_symbols_memo: Optional[Dict[str, asyncio.Task]] = None,
+    ) -> multilspy_types.UnifiedSymbolInformation | None:
+        """
+        Implements request_containing_symbol (see there for the parameters).
+
+        :param document_symbols_memo: see _request_document_symbols_memoized.
+        """
+        # files without in-memory edits are identified by their stat (as in request_document_symbols), such that cache hits
+        # require neither reading nor hashing them
+        cache_key = None
+        if not self._has_unsaved_edits(relative_file_path):
+            file_stat = self._get_file_stat(relative_file_path)
+            if file_stat is not None:
+                cache_key = (relative_file_path, file_stat, line, column, strict)
+
+        # entries are only added for non-empty lines, so the check is only required upon a cache miss
+        if cache_key is None or cache_key not in self._containing_symbol_cache:
+            # checking if the line is empty, unfortunately ugly and duplicating code, but I don't want to refactor
+            with self.open_file(relative_file_path) as file_data:
+                if file_data.get_line(line).strip() == "":
+                    self.logger.log(
+                        f"Passing empty lines to request_container_symbol is currently not supported, {relative_file_path=}, {line=}",
+                        logging.ERROR,
+                    )
+                    return None
+                if cache_key is None:
+                    cache_key = (relative_file_path, file_data.content_hash, line, column, strict)
+
+        if cache_key in self._containing_symbol_cache:
+            self._containing_symbol_cache.move_to_end(cache_key)
+            containing_symbol = self._containing_symbol_cache[cache_key]
+        else:
+            containing_symbol = await self._find_containing_symbol(relative_file_path, line, column, strict, document_symbols_memo)
+            self._containing_symbol_cache[cache_key] = containing_symbol
+            if len(self._containing_symbol_cache) > self.CONTAINING_SYMBOL_CACHE_SIZE:
+                self._containing_symbol_cache.popitem(last=False)
+
+        if containing_symbol is not None and include_body:
+            containing_symbol["body"] = self.retrieve_symbol_body(containing_symbol)
+        return containing_symbol
+
+    async def _find_containing_symbol(
+        self,
+        relative_file_path: str,
+        line: int,
+        column: Optional[int],
+        strict: bool,
+        document_symbols_memo: Optional[Dict[str, asyncio.Task]],
+    ) -> multilspy_types.UnifiedSymbolInformation | None:
+        """
+        Finds the containing symbol for _request_containing_symbol (bypassing the cache and without retrieving the body).
+        """
+        symbols, _ = await self._request_document_symbols_memoized(relative_file_path, document_symbols_memo)
+        candidate_containers, candidate_start_lines, candidate_max_end_lines = self._get_containing_symbol_candidates(relative_file_path, symbols)
+        if not candidate_containers:
+            return None
+
+        # Find the candidate with the greatest starting line (i.e. the innermost container) whose range contains the
+        # given position: we go through the candidates starting at or above the line in order of decreasing start line,
+        # and among several containing candidates with the same start line, we return the first one (in candidate order).
+        # Once none of the remaining candidates ends at or below the line, none of them can contain the position.
+        # The position is in the range of a candidate if the candidate ends at or below the line and
+        # starts above the position (or, if strict=False, at the position).
+        containing_symbol = None
+        containing_symbol_start_line = None
+        for i in range(bisect.bisect_right(candidate_start_lines, line) - 1, -1, -1):
+            start_line = candidate_start_lines[i]
+            if containing_symbol is not None and start_line != containing_symbol_start_line:
+                break
+            if candidate_max_end_lines[i] < line:
+                break
+            range_d = candidate_containers[i]["location"]["range"]
+            if range_d["end"]["line"] < line:
+                continue
+            if strict:
+                is_in_range = line > start_line and (column is None or column > range_d["start"]["character"])
+            else:
+                is_in_range = column is None or column >= range_d["start"]["character"]
+            if is_in_range:
+                containing_symbol = candidate_containers[i]
+                containing_symbol_start_line = start_line
+        return containing_symbol
+
+    def _get_containing_symbol_candidates(
+        self, relative_file_path: str, symbols: List[multilspy_types.UnifiedSymbolInformation]
+    ) -> Tuple[List[multilspy_types.UnifiedSymbolInformation], List[int], List[int]]:
+        """
+        Returns the symbols of the given file that can contain other symbols (sorted by start line) along with their start lines
+        and, for each candidate, the maximum end line of all candidates up to (and including) it.
+        The result is computed once for each document symbols result of a file (i.e. it is recomputed only if the
+        document symbols changed).
+
+        :param relative_file_path: The relative path of the file.
+        :param symbols: The (flat) list of document symbols of the file.
+        """
+        index = self._containing_symbol_candidates.get(relative_file_path)
+        if index is not None and index[0] is symbols:
+            return index[1], index[2], index[3]
 
-        symbols, _ = await self.request_document_symbols(relative_file_path)
-        
         # make jedi and pyright api compatible
         # the former has no location, the later has no range
         # we will just always add location of the desired format to all symbols
+        absolute_file_path = os.path.join(self._root_path, relative_file_path)
+        uri = self._rel_to_uri(relative_file_path)
         for symbol in symbols:
             if "location" not in symbol:
                 range = symbol["range"]
@@ -1273,58 +1735,28 @@ class LanguageServer:
                 assert "range" in location
                 location["absolutePath"] = absolute_file_path
                 location["relativePath"] = relative_file_path
-                location["uri"] = Path(absolute_file_path).as_uri()
-
-        # Allowed container kinds, currently only for Python
-        container_symbol_kinds = {
-            multilspy_types.SymbolKind.Method, 
-            multilspy_types.SymbolKind.Function, 
-            multilspy_types.SymbolKind.Class
-        }
-
-        def is_position_in_range(line: int, range_d: multilspy_types.Range) -> bool:
-            start = range_d["start"]
-            end = range_d["end"]
-
-            column_condition = True
-            if strict:
-                line_condition = end["line"] >= line > start["line"]
-                if column is not None:
-                    column_condition = column > start["character"]
-            else:
-                line_condition = end["line"] >= line >= start["line"]
-                if column is not None:
-                    column_condition = column >= start["character"]
-            return line_condition and column_condition
-
-        # Only consider containers that are not one-liners (otherwise we may get imports)
-        candidate_containers = [
-            s for s in symbols if s["kind"] in container_symbol_kinds and s["location"]["range"]["start"]["line"] != s["location"]["range"]["end"]["line"]
-        ]
-        var_containers = [
-            s for s in symbols if s["kind"] == multilspy_types.SymbolKind.Variable
-        ]
+                location["uri"] = uri
+
+        # Only consider containers that are not one-liners (otherwise we may get imports); variables are also
+        # candidates (but come after the other containers)
+        candidate_containers = []
+        var_containers = []
+        for s in symbols:
+            kind = s["kind"]
+            if kind in _CONTAINER_SYMBOL_KINDS:
+                range_d = s["location"]["range"]
+                if range_d["start"]["line"] != range_d["end"]["line"]:
+                    candidate_containers.append(s)
+            elif kind == SymbolKind.Variable:
+                var_containers.append(s)
         candidate_containers.extend(var_containers)
-        
-        if not candidate_containers:
-            return None
-
-        # From the candidates, find those whose range contains the given position.
-        containing_symbols = []
-        for symbol in candidate_containers:
-            s_range = symbol["location"]["range"]
-            if not is_position_in_range(line, s_range):
-                continue
-            containing_symbols.append(symbol)
+        # sorting is stable, so candidates with the same start line retain their order
+        candidate_containers.sort(key=lambda s: s["location"]["range"]["start"]["line"])
+        candidate_start_lines = [s["location"]["range"]["start"]["line"] for s in candidate_containers]
+        candidate_max_end_lines = list(itertools.accumulate((s["location"]["range"]["end"]["line"] for s in candidate_containers), max))
 
-        if containing_symbols:
-            # Return the one with the greatest starting position (i.e. the innermost container).
-            containing_symbol = max(containing_symbols, key=lambda s: s["location"]["range"]["start"]["line"])
-            if include_body:
-                containing_symbol["body"] = self.retrieve_symbol_body(containing_symbol)
-            return containing_symbol
-        else:
-            return None
+        self._containing_symbol_candidates[relative_file_path] = (symbols, candidate_containers, candidate_start_lines, candidate_max_end_lines)
+        return candidate_containers, candidate_start_lines, candidate_max_end_lines
     
     async def request_container_of_symbol(self, symbol: multilspy_types.UnifiedSymbolInformation, include_body: bool = False) -> multilspy_types.UnifiedSymbolInformation | None:
         """
@@ -1361,49 +1793,160 @@ class LanguageServer:
         :param include_body: whether to include the body of the symbol in the result.
         :return: The symbol information for the definition, or None if not found.
         """
+        defining_symbols = await self.request_defining_symbols_batch([(relative_file_path, line, column)], include_body=include_body)
+        return defining_symbols[0]
+
+    async def request_defining_symbols_batch(
+        self,
+        locations: List[Tuple[str, int, int]],
+        include_body: bool = False,
+    ) -> List[Optional[multilspy_types.UnifiedSymbolInformation]]:
+        """
+        Like request_defining_symbol, but for several locations at once. The definitions of all (unique) locations are
+        requested concurrently, and so are the symbols containing the (unique) definitions, with the document symbols of each
+        defining file being requested only once.
+
+        :param locations: the locations as tuples (relative file path, 0-indexed line, 0-indexed column).
+        :param include_body: whether to include the body of the symbols in the result.
+        :return: for each location, the symbol information for the definition, or None if not found.
+        """
         if not self.server_started:
             self.logger.log(
                 "request_defining_symbol called before Language Server started",
                 logging.ERROR,
             )
             raise MultilspyException("Language Server not started")
-            
-        # Get the definition location(s)
-        definitions = await self.request_definition(relative_file_path, line, column)
-        if not definitions:
-            return None
-        
-        # Use the first definition location
-        definition = definitions[0]
-        def_path = definition["relativePath"]
-        def_line = definition["range"]["start"]["line"]
-        def_col = definition["range"]["start"]["character"]
-        
-        # Find the symbol at or containing this location
-        defining_symbol = await self.request_containing_symbol(
-            def_path, def_line, def_col, strict=False, include_body=include_body
+
+        # Get the definition location(s), requesting them only once for locations that occur several times
+        unique_locations = list(dict.fromkeys(locations))
+        definitions_per_location = await asyncio.gather(
+            *(self.request_definition(relative_file_path, line, column) for relative_file_path, line, column in unique_locations)
         )
-        
-        return defining_symbol
+
+        # Use the first definition location of each location
+        def_position_by_location: Dict[Tuple[str, int, int], Optional[Tuple[str, int, int]]] = {}
+        for location, definitions in zip(unique_locations, definitions_per_location):
+            if not definitions:
+                def_position_by_location[location] = None
+                continue
+            definition = definitions[0]
+            def_start = definition["range"]["start"]
+            def_position_by_location[location] = (definition["relativePath"], def_start["line"], def_start["character"])
+        def_positions = [def_position_by_location[location] for location in locations]
+
+        # Find the symbol at or containing each of these locations
+        unique_def_positions = list(dict.fromkeys(p for p in def_positions if p is not None))
+        document_symbols_memo: Dict[str, asyncio.Task] = {}
+        defining_symbols = await asyncio.gather(
+            *(
+                self._request_containing_symbol(
+                    def_path, def_line, def_col, strict=False, include_body=include_body, document_symbols_memo=document_symbols_memo
+                )
+                for def_path, def_line, def_col in unique_def_positions
+            )
+        )
+        defining_symbol_by_position = dict(zip(unique_def_positions, defining_symbols))
+        return [None if p is None else defining_symbol_by_position[p] for p in def_positions]
     
     @property
     def _cache_path(self) -> Path:
+        """Path of the single-file cache written by earlier versions (which is migrated to the cache directory)"""
         return Path(self.repository_root_path) / ".serena" / "cache" / "document_symbols_cache.pkl"
-    
+
+    @property
+    def _cache_dir(self) -> Path:
+        """Directory containing one file per document symbols cache entry"""
+        return Path(self.repository_root_path) / ".serena" / "cache" / "document_symbols"
+
+    def _cache_entry_path(self, cache_key: str) -> Path:
+        return self._cache_dir / (hashlib.blake2b(cache_key.encode("utf-8"), digest_size=16).hexdigest() + ".pkl")
+
+    def _get_cached_document_symbols(
+        self, cache_key: str
+    ) -> Optional[Tuple[str, Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]]]:
+        """
+        Returns the document symbols cache entry for the given key, loading it from the cache directory if it is not in memory yet.
+        """
+        if cache_key in self._document_symbols_cache:
+            return self._document_symbols_cache[cache_key]
+        entry_path = self._cache_entry_path(cache_key)
+        try:
+            with open(entry_path, "rb") as f:
+                # the header is stored first, such that entries in an outdated format are skipped without loading them
+                if pickle.load(f) != self._DOCUMENT_SYMBOLS_CACHE_HEADER:
+                    return None
+                entry = pickle.load(f)
+            if entry["cache_key"] != cache_key:
+                return None
+            content_hash_and_result = (entry["content_hash"], entry["result"])
+            file_stat = entry["file_stat"]
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # a corrupt entry is treated like a missing one (it will be overwritten)
+            self.logger.log(f"Could not load document symbols cache entry from {entry_path}", logging.WARNING)
+            return None
+        self._document_symbols_cache[cache_key] = content_hash_and_result
+        if file_stat is not None:
+            self._document_symbols_file_stats[cache_key] = file_stat
+        return content_hash_and_result
+
+    def _has_unsaved_cache_changes(self) -> bool:
+        """
+        :return: whether the document symbols cache contains changes which save_cache would write
+        """
+        return self._cache_has_changed
+
     def save_cache(self):
         if self._cache_has_changed:
-            self.logger.log(f"Saving updated document symbols cache to {self._cache_path}", logging.INFO)
-            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self._cache_path, "wb") as f:
-                pickle.dump(self._document_symbols_cache, f)
-            
+            self.logger.log(f"Saving {len(self._dirty_cache_keys)} updated document symbols cache entries to {self._cache_dir}", logging.INFO)
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            # only the entries that were added or changed since the cache was loaded/saved need to be written
+            for cache_key in self._dirty_cache_keys:
+                content_hash, result = self._document_symbols_cache[cache_key]
+                # the file stat is persisted along with the result, such that unchanged files need not be read after a restart
+                entry = {
+                    "cache_key": cache_key,
+                    "content_hash": content_hash,
+                    "result": result,
+                    "file_stat": self._document_symbols_file_stats.get(cache_key),
+                }
+                # write to a temporary file that replaces the entry atomically, such that an
+                # interrupted write (e.g. upon process termination) cannot leave behind a corrupt entry
+                entry_path = self._cache_entry_path(cache_key)
+                tmp_entry_path = entry_path.with_suffix(".tmp")
+                with open(tmp_entry_path, "wb") as f:
+                    pickle.dump(self._DOCUMENT_SYMBOLS_CACHE_HEADER, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_entry_path, entry_path)
+            # the entries of a migrated single-file cache are now contained in the cache directory
+            self._cache_path.unlink(missing_ok=True)
+            self._dirty_cache_keys.clear()
+            self._cache_has_changed = False
+
     def load_cache(self):
+        """
+        Discards the in-memory document symbols cache; entries are loaded from the cache directory on demand,
+        such that the cost of loading does not depend on the overall size of the cache.
+        A single-file cache written by an earlier version is loaded eagerly (and migrated upon the next save).
+        """
+        self._document_symbols_cache = {}
+        self._document_symbols_file_stats = {}
+        self._dirty_cache_keys = set()
         if not self._cache_path.exists():
             return
         self.logger.log(f"Loading document symbols cache from {self._cache_path}", logging.INFO)
         with open(self._cache_path, "rb") as f:
             try:
-                self._document_symbols_cache = pickle.load(f)
+                cache_data = pickle.load(f)
+                if "document_symbols" in cache_data and "file_stats" in cache_data:
+                    self._document_symbols_cache = cache_data["document_symbols"]
+                    self._document_symbols_file_stats = cache_data["file_stats"]
+                else:
+                    # cache written by an older version, which contains only the results (and no file stats)
+                    self._document_symbols_cache = cache_data
+                self._dirty_cache_keys.update(self._document_symbols_cache)
+                self._cache_has_changed = True
             except:
                 # cache often becomes corrupt, so just skip loading it
                 pass
@@ -1416,12 +1959,227 @@ class SyncLanguageServer:
     It is used to communicate with Language Servers of different programming languages.
     """
 
-    def __init__(self, language_server: LanguageServer) -> None:
+    DEFINING_SYMBOL_CACHE_SIZE = 4096
+    """The maximum number of results of request_defining_symbol that are kept in memory"""
+
+    _shared_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    _shared_loop_thread: ClassVar[Optional[threading.Thread]] = None
+    _shared_loop_users: ClassVar[int] = 0
+    """the number of started instances using the shared loop"""
+    _shared_loop_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        language_server: LanguageServer,
+        request_timeout: Optional[float] = None,
+        share_event_loop: bool = False,
+        pin_loop_thread: bool = False,
+    ) -> None:
+        """
+        :param language_server: the language server to wrap.
+        :param request_timeout: the maximum number of seconds to wait for the result of a request; None to wait indefinitely.
+        :param share_event_loop: whether to run the language server on an event loop (and thread) which is shared with
+            all other SyncLanguageServer instances that also use the shared loop, instead of on a loop of its own.
+        :param pin_loop_thread: whether to pin the thread running the event loop to a single CPU core and to try to raise
+            its priority (Linux only), reducing the latency with which the loop thread picks up requests.
+            The thread is pinned only once the language server process has been started (as processes inherit the
+            affinity of the thread starting them), and only if the loop is not shared.
+        """
         self.language_server = language_server
+        self.request_timeout = request_timeout
+        self.share_event_loop = share_event_loop
+        self.pin_loop_thread = pin_loop_thread
         self.loop = None
         self.loop_thread = None
         
         self._server_context = None
+        self._ready = threading.Event()
+        """set while the language server is started (and not being stopped), such that requests can be submitted"""
+        self._cache_flush_thread: Optional[threading.Thread] = None
+        """the thread writing the cache in the background after the language server was stopped, see save_cache"""
+        self._loop_thread_unpinned_state: Optional[Tuple[Set[int], int]] = None
+        """the CPU affinity and priority of the loop thread before it was pinned (if it is pinned), see pin_loop_thread"""
+        self._defining_symbol_cache: OrderedDict[
+            Tuple[str, int, int, bool], Tuple[Tuple[int, int], str, Tuple[int, int], multilspy_types.UnifiedSymbolInformation]
+        ] = OrderedDict()
+        """
+        LRU cache mapping (file path, line, column, include_body) to the stamp of the file, the path and stamp of the file
+        containing the defining symbol, and the defining symbol, where a stamp is the (mtime_ns, size) of a file on disk.
+        Entries are only valid as long as both files are unchanged, see _get_file_stamp.
+        """
+        self._defining_symbol_cache_lock = threading.Lock()
+        """guards _defining_symbol_cache, which is accessed by the threads calling request_defining_symbol"""
+
+    @classmethod
+    def _acquire_shared_loop(cls) -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+        """
+        Returns the event loop shared by SyncLanguageServer instances (along with the daemon thread running it),
+        starting it if necessary. Each call must be matched by a call to _release_shared_loop.
+        """
+        with cls._shared_loop_lock:
+            if cls._shared_loop is None or cls._shared_loop_thread is None or not cls._shared_loop_thread.is_alive():
+                cls._shared_loop, cls._shared_loop_thread = cls._start_loop_thread(name="multilspy-shared-loop")
+            cls._shared_loop_users += 1
+            return cls._shared_loop, cls._shared_loop_thread
+
+    @classmethod
+    def _release_shared_loop(cls) -> None:
+        """
+        Releases the shared event loop, stopping it (and joining its thread) once it is no longer used by any instance.
+        """
+        with cls._shared_loop_lock:
+            cls._shared_loop_users -= 1
+            if cls._shared_loop_users > 0 or cls._shared_loop is None or cls._shared_loop_thread is None:
+                return
+            loop, thread = cls._shared_loop, cls._shared_loop_thread
+            cls._shared_loop = None
+            cls._shared_loop_thread = None
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    @staticmethod
+    def _start_loop_thread(name: Optional[str] = None) -> Tuple[asyncio.AbstractEventLoop, threading.Thread]:
+        """
+        Creates a new event loop (a uvloop loop if uvloop is installed) and runs it forever in a new daemon thread.
+
+        :param name: the name of the thread.
+        """
+        loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+
+        def run_loop() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_forever()
+
+        thread = threading.Thread(target=run_loop, name=name, daemon=True)
+        thread.start()
+        return loop, thread
+
+    @staticmethod
+    def _pin_current_thread() -> Optional[Tuple[Set[int], int]]:
+        """
+        Pins the calling thread to the lowest-numbered CPU core it may run on and tries to raise its priority.
+        Does nothing on platforms without support for CPU affinity; raising the priority usually requires privileges
+        and is skipped if they are lacking.
+
+        :return: the previous CPU affinity and priority of the thread (to be restored with _unpin_current_thread), or None
+            if the platform does not support CPU affinity
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            return None
+        # on Linux, affinity and niceness apply to the calling thread (rather than the entire process) if pid 0 is passed
+        unpinned_state = os.sched_getaffinity(0), os.getpriority(os.PRIO_PROCESS, 0)
+        os.sched_setaffinity(0, {min(unpinned_state[0])})
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, -5)
+        except PermissionError:
+            pass
+        return unpinned_state
+
+    @staticmethod
+    def _unpin_current_thread(unpinned_state: Tuple[Set[int], int]) -> None:
+        """
+        Restores the CPU affinity and priority of the calling thread, which was pinned with _pin_current_thread.
+
+        :param unpinned_state: the state returned by _pin_current_thread.
+        """
+        affinity, priority = unpinned_state
+        os.sched_setaffinity(0, affinity)
+        os.setpriority(os.PRIO_PROCESS, 0, priority)
+
+    def _start_loop(self) -> None:
+        # the language server must not be used while its cache is still being written
+        self._wait_for_cache_flush()
+        if self.share_event_loop:
+            self.loop, self.loop_thread = self._acquire_shared_loop()
+        else:
+            self.loop, self.loop_thread = self._start_loop_thread()
+
+    def _on_server_started(self) -> None:
+        self._ready.set()
+        if self.pin_loop_thread and not self.share_event_loop:
+            self._loop_thread_unpinned_state = self._run(self._call_async(self._pin_current_thread))
+
+    def _stop_server_and_loop(self, server_context: Optional[AsyncContextManager]) -> None:
+        """
+        Exits the given server context (stopping the language server) and then stops the event loop.
+
+        :param server_context: the context returned by the language server's start_server, which was entered on the loop;
+            None if the server was already stopped (such that only the loop is to be stopped).
+        """
+        loop = self.loop
+        assert loop is not None and self.loop_thread is not None
+        self._ready.clear()
+        if self.share_event_loop:
+            if server_context is not None:
+                asyncio.run_coroutine_threadsafe(server_context.__aexit__(None, None, None), loop=loop).result()
+            # the shared loop keeps running as long as it is used by other instances
+            self._release_shared_loop()
+        else:
+            # exiting the context and stopping the loop are combined in a single submission; the loop stops right after
+            # the task has completed, so once the thread has terminated, the task's result is available
+            async def exit_server_context_and_stop_loop() -> None:
+                try:
+                    if server_context is not None:
+                        await server_context.__aexit__(None, None, None)
+                finally:
+                    # cancel the tasks that are still pending on the loop (e.g. requests submitted concurrently by other
+                    # threads), such that they do not linger (unfinished) in the stopped loop
+                    # all_tasks scans every task of the loop, so it is called only once (as is current_task)
+                    current_task = asyncio.current_task()
+                    pending_tasks = [task for task in asyncio.all_tasks(loop) if task is not current_task]
+                    for task in pending_tasks:
+                        task.cancel()
+                    await asyncio.gather(*pending_tasks, return_exceptions=True)
+                    loop.stop()
+
+            tasks: List[asyncio.Task] = []
+            loop.call_soon_threadsafe(lambda: tasks.append(loop.create_task(exit_server_context_and_stop_loop())))
+            self.loop_thread.join()
+            tasks[0].result()
+        self.loop = None
+        self.loop_thread = None
+
+    def _ensure_ready(self) -> None:
+        """
+        Raises an exception (without any interaction with the loop thread) if the language server is not started.
+        """
+        if not self._ready.is_set():
+            raise MultilspyException("Language Server not started")
+
+    def _run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Runs the given coroutine on the event loop of the language server and waits for its result.
+
+        :param coro: the coroutine to run.
+        :param timeout: the maximum number of seconds to wait; if None, the request timeout of this instance applies.
+            If the timeout expires, the coroutine is cancelled and a TimeoutError is raised.
+        """
+        try:
+            self._ensure_ready()
+        except MultilspyException:
+            coro.close()
+            raise
+        loop = self.loop
+        # a lighter-weight version of run_coroutine_threadsafe(...).result(): the task is created in the loop thread,
+        # and the completed task is handed back through a queue (a single C-level put/get) instead of a chained
+        # concurrent.futures.Future (which waits on a condition variable)
+        completed_tasks: "queue.SimpleQueue[asyncio.Task]" = queue.SimpleQueue()
+        tasks: List[asyncio.Task] = []
+
+        def submit() -> None:
+            task = loop.create_task(coro)
+            tasks.append(task)
+            task.add_done_callback(completed_tasks.put)
+
+        loop.call_soon_threadsafe(submit)
+        try:
+            task = completed_tasks.get(timeout=self.request_timeout if timeout is None else timeout)
+        except queue.Empty:
+            # callbacks are processed in order, so the task exists by the time the cancellation is processed
+            loop.call_soon_threadsafe(lambda: tasks[0].cancel())
+            raise concurrent.futures.TimeoutError() from None
+        return task.result()
 
     @classmethod
     def create(
@@ -1438,7 +2196,12 @@ class SyncLanguageServer:
 
         :return SyncLanguageServer: A language specific LanguageServer instance.
         """
-        return SyncLanguageServer(LanguageServer.create(config, logger, repository_root_path))
+        return SyncLanguageServer(
+            LanguageServer.create(config, logger, repository_root_path),
+            request_timeout=config.request_timeout,
+            share_event_loop=config.share_event_loop,
+            pin_loop_thread=config.pin_loop_thread,
+        )
 
     @contextmanager
     def open_file(self, relative_file_path: str) -> Iterator[LSPFileBuffer]:
@@ -1474,6 +2237,18 @@ class SyncLanguageServer:
         Delete text between the given start and end positions in the given file and return the deleted text.
         """
         return self.language_server.delete_text_between_positions(relative_file_path, start, end)
+
+    @contextmanager
+    def batch_edits(self, relative_file_path: str) -> Iterator[None]:
+        """
+        Within this context, the edits made to the given file via insert_text_at_position and delete_text_between_positions
+        are not sent to the Language Server individually but as a single didChange notification upon exiting the context.
+        The file must be open for the entire duration of the context.
+
+        :param relative_file_path: The relative path of the file that is to be edited.
+        """
+        with self.language_server.batch_edits(relative_file_path):
+            yield
    
     @contextmanager
     def start_server(self) -> Iterator["SyncLanguageServer"]:
@@ -1482,15 +2257,13 @@ class SyncLanguageServer:
 
         :return: None
         """
-        self.loop = asyncio.new_event_loop()
-        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
-        self.loop_thread.start()
+        self._start_loop()
         ctx = self.language_server.start_server()
         asyncio.run_coroutine_threadsafe(ctx.__aenter__(), loop=self.loop).result()
+        self._on_server_started()
         yield self
-        asyncio.run_coroutine_threadsafe(ctx.__aexit__(None, None, None), loop=self.loop).result()
-        self.loop.call_soon_threadsafe(self.loop.stop)
-        self.loop_thread.join()
+        self._stop_server_and_loop(ctx)
+        self.save_cache(async_flush=True)
 
     def request_definition(self, file_path: str, line: int, column: int) -> List[multilspy_types.Location]:
         """
@@ -1503,10 +2276,7 @@ class SyncLanguageServer:
 
         :return List[multilspy_types.Location]: A list of locations where the symbol is defined
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_definition(file_path, line, column), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_definition(file_path, line, column))
 
     def request_references(self, file_path: str, line: int, column: int) -> List[multilspy_types.Location]:
         """
@@ -1519,10 +2289,7 @@ class SyncLanguageServer:
 
         :return List[multilspy_types.Location]: A list of locations where the symbol is referenced
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_references(file_path, line, column), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_references(file_path, line, column))
     
     def request_references_with_content(
         self, relative_file_path: str, line: int, column: int, context_lines_before: int = 0, context_lines_after: int = 0
@@ -1538,10 +2305,7 @@ class SyncLanguageServer:
 
         :return: A list of MatchedConsecutiveLines objects, one for each reference.
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_references_with_content(relative_file_path, line, column, context_lines_before, context_lines_after), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_references_with_content(relative_file_path, line, column, context_lines_before, context_lines_after))
     
     def request_completions(
         self, relative_file_path: str, line: int, column: int, allow_incomplete: bool = False
@@ -1556,11 +2320,7 @@ class SyncLanguageServer:
 
         :return List[multilspy_types.CompletionItem]: A list of completions
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_completions(relative_file_path, line, column, allow_incomplete),
-            self.loop,
-        ).result()
-        return result
+        return self._run(self.language_server.request_completions(relative_file_path, line, column, allow_incomplete))
 
     def request_document_symbols(self, relative_file_path: str, include_body: bool = False) -> Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]:
         """
@@ -1571,10 +2331,7 @@ class SyncLanguageServer:
         :param include_body: whether to include the body of the symbols in the result.
         :return: A list of symbols in the file, and a list of root symbols that represent the tree structure of the symbols. Each symbol in hierarchy starting from the roots has a children attribute.
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_document_symbols(relative_file_path, include_body), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_document_symbols(relative_file_path, include_body))
     
     def request_full_symbol_tree(self, within_relative_path: str | None = None, include_body: bool = False) -> List[multilspy_types.UnifiedSymbolInformation]:
         """
@@ -1593,10 +2350,7 @@ class SyncLanguageServer:
 
         :return: A list of root symbols representing the top-level packages/modules in the project.
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_full_symbol_tree(within_relative_path, include_body), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_full_symbol_tree(within_relative_path, include_body))
     
     def request_dir_overview(self, relative_dir_path: str) -> dict[str, list[tuple[str, multilspy_types.SymbolKind, int, int]]]:
         """
@@ -1605,11 +2359,7 @@ class SyncLanguageServer:
         Maps relative paths of all contained files to info about top-level symbols in the file 
         (name, kind, line, column).
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_dir_overview(relative_dir_path), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_dir_overview(relative_dir_path))
     
     def request_document_overview(self, relative_file_path: str) -> list[tuple[str, multilspy_types.SymbolKind, int, int]]:
         """
@@ -1617,11 +2367,7 @@ class SyncLanguageServer:
         
         Returns the list of tuples (name, kind, line, column) of all top-level symbols in the file.
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_document_overview(relative_file_path), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_document_overview(relative_file_path))
 
     def request_hover(self, relative_file_path: str, line: int, column: int) -> Union[multilspy_types.Hover, None]:
         """
@@ -1634,10 +2380,7 @@ class SyncLanguageServer:
 
         :return None
         """
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_hover(relative_file_path, line, column), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_hover(relative_file_path, line, column))
     
     # ----------------------------- FROM HERE ON MODIFICATIONS BY MISCHA --------------------
     
@@ -1654,11 +2397,7 @@ class SyncLanguageServer:
         """This is slow, as it finds all files by finding all symbols. 
         
         This seems to be the only way, the LSP does not provide any endpoints for listing project files."""
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_parsed_files(), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_parsed_files())
     
     def request_referencing_symbols(
         self, relative_file_path: str, line: int, column: int,
@@ -1684,8 +2423,7 @@ class SyncLanguageServer:
             is often a fallback mechanism for when the reference cannot be resolved to a symbol.
         :return: List of symbols that reference the target symbol.
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
+        return self._run(
             self.language_server.request_referencing_symbols(
                 relative_file_path, 
                 line, 
@@ -1694,10 +2432,8 @@ class SyncLanguageServer:
                 include_self=include_self,
                 include_body=include_body,
                 include_file_symbols=include_file_symbols,
-            ), 
-            self.loop
-        ).result()
-        return result
+            )
+        )
         
     def request_containing_symbol(
         self, relative_file_path: str, line: int, 
@@ -1730,11 +2466,7 @@ class SyncLanguageServer:
         :param include_body: whether to include the body of the symbol in the result.
         :return: The container symbol (if found) or None.
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_containing_symbol(relative_file_path, line, column=column, strict=strict, include_body=include_body), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_containing_symbol(relative_file_path, line, column=column, strict=strict, include_body=include_body))
     
     def request_container_of_symbol(self, symbol: multilspy_types.UnifiedSymbolInformation, include_body: bool = False) -> multilspy_types.UnifiedSymbolInformation | None:
         """
@@ -1743,11 +2475,7 @@ class SyncLanguageServer:
         :param symbol: The symbol to find the container of.
         :param include_body: whether to include the body of the symbol in the result.
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_container_of_symbol(symbol, include_body=include_body), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.request_container_of_symbol(symbol, include_body=include_body))
     
     def request_defining_symbol(
         self, relative_file_path: str, line: int, column: int, 
@@ -1763,13 +2491,63 @@ class SyncLanguageServer:
         :param line: The 0-indexed line number.
         :param column: The 0-indexed column number.
         :param include_body: whether to include the body of the symbol in the result.
-        :return: The symbol information for the definition, or None if not found.
+        :return: The symbol information for the definition, or None if not found. The result may be answered from a cache,
+            which holds a shallow copy of it; nested values (such as the location) must not be modified.
+        """
+        self._ensure_ready()
+        # repeated requests for the same position are answered without a round trip to the loop (and the server),
+        # as long as neither the file nor the file containing the defining symbol changed
+        cache_key = (relative_file_path, line, column, include_body)
+        stamp = self._get_file_stamp(relative_file_path)
+        if stamp is not None:
+            with self._defining_symbol_cache_lock:
+                entry = self._defining_symbol_cache.get(cache_key)
+            if entry is not None and entry[0] == stamp and self._get_file_stamp(entry[1]) == entry[2]:
+                with self._defining_symbol_cache_lock:
+                    # the entry may have been evicted by another thread in the meantime
+                    if cache_key in self._defining_symbol_cache:
+                        self._defining_symbol_cache.move_to_end(cache_key)
+                return cast(multilspy_types.UnifiedSymbolInformation, dict(entry[3]))
+
+        defining_symbol = self._run(self.language_server.request_defining_symbol(relative_file_path, line, column, include_body=include_body))
+
+        # results are not cached if no symbol was found, as a definition might yet appear in any other file
+        if stamp is not None and defining_symbol is not None and "location" in defining_symbol:
+            defining_file_path = defining_symbol["location"].get("relativePath")
+            defining_file_stamp = self._get_file_stamp(defining_file_path) if defining_file_path is not None else None
+            if defining_file_stamp is not None:
+                # the cache holds a copy, such that modifications of the returned symbol by the caller do not affect it
+                cached_symbol = cast(multilspy_types.UnifiedSymbolInformation, dict(defining_symbol))
+                with self._defining_symbol_cache_lock:
+                    self._defining_symbol_cache[cache_key] = (stamp, defining_file_path, defining_file_stamp, cached_symbol)
+                    if len(self._defining_symbol_cache) > self.DEFINING_SYMBOL_CACHE_SIZE:
+                        self._defining_symbol_cache.popitem(last=False)
+        return defining_symbol
+
+    def _get_file_stamp(self, relative_file_path: str) -> Optional[Tuple[int, int]]:
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.request_defining_symbol(relative_file_path, line, column, include_body=include_body), self.loop
-        ).result()
-        return result
+        :return: the (mtime_ns, size) of the given file, or None if the file cannot be accessed or has unsaved edits
+            (in which case results concerning the file must not be cached)
+        """
+        if self.language_server._has_unsaved_edits(relative_file_path):
+            return None
+        try:
+            stat_result = os.stat(os.path.join(self.language_server.repository_root_path, relative_file_path))
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def request_defining_symbols_batch(
+        self, locations: List[Tuple[str, int, int]], include_body: bool = False
+    ) -> List[Optional[multilspy_types.UnifiedSymbolInformation]]:
+        """
+        Like request_defining_symbol, but for several locations at once (which are processed concurrently).
+
+        :param locations: the locations as tuples (relative file path, 0-indexed line, 0-indexed column).
+        :param include_body: whether to include the body of the symbols in the result.
+        :return: for each location, the symbol information for the definition, or None if not found.
+        """
+        return self._run(self.language_server.request_defining_symbols_batch(locations, include_body=include_body))
     
     def retrieve_full_file_content(self, relative_file_path: str) -> str:
         """
@@ -1807,47 +2585,130 @@ class SyncLanguageServer:
         :param paths_exclude_glob: Glob pattern to filter which files to exclude from the search. Takes precedence over paths_include_glob.
         :return: List of matched consecutive lines with context
         """
-        assert self.loop
-        result = asyncio.run_coroutine_threadsafe(
-            self.language_server.search_files_for_pattern(pattern, context_lines_before, context_lines_after, paths_include_glob, paths_exclude_glob), self.loop
-        ).result()
-        return result
+        return self._run(self.language_server.search_files_for_pattern(pattern, context_lines_before, context_lines_after, paths_include_glob, paths_exclude_glob))
     
     def start(self) -> "SyncLanguageServer":
         """
-        Starts the language server process and connects to it. Call shutdown when ready.
+        Starts the language server process and connects to it. Call stop when ready, or use the instance as a context
+        manager (`with SyncLanguageServer.create(...) as ls: ...`), which starts and stops the language server.
+        If stop is not called, the language server is stopped when the interpreter exits.
+        If the language server was stopped with keep_loop=True, its event loop (and thread) is reused.
 
         :return: self for method chaining
         """
-        self.loop = asyncio.new_event_loop()
-        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
-        self.loop_thread.start()
-        self._server_context = self.language_server.start_server()
-        asyncio.run_coroutine_threadsafe(self._server_context.__aenter__(), loop=self.loop).result()
+        if self._server_context is not None:
+            raise MultilspyException("Language Server already started")
+        if self.loop is None:
+            self._start_loop()
+        else:
+            self._wait_for_cache_flush()
+            if self._loop_thread_unpinned_state is not None:
+                # the server process inherits the affinity and priority of the loop thread (which starts it), so the
+                # thread is unpinned while the server is restarted (and pinned again afterwards)
+                unpinned_state, self._loop_thread_unpinned_state = self._loop_thread_unpinned_state, None
+                asyncio.run_coroutine_threadsafe(
+                    self._call_async(lambda: self._unpin_current_thread(unpinned_state)), loop=self.loop
+                ).result()
+        server_context = self.language_server.start_server()
+        asyncio.run_coroutine_threadsafe(server_context.__aenter__(), loop=self.loop).result()
+        # the context is only recorded once it was entered, such that start may be retried if starting the server failed
+        self._server_context = server_context
+        self._on_server_started()
+        # stop the server upon interpreter exit (while the loop thread is still alive) if the user does not
+        atexit.register(self._stop_at_exit)
         return self
 
-    def stop(self) -> None:
+    def stop(self, keep_loop: bool = False) -> None:
         """
-        Shuts down the language server process and cleans up resources.
-        Must be called after start().
+        Shuts down the language server process, cleans up resources and saves the document symbols cache
+        (in a background thread, see save_cache). Does nothing if the language server is not started (e.g. if it was
+        already stopped), such that stop may safely be called several times.
+
+        :param keep_loop: whether to keep the event loop (and the thread running it) alive, such that a subsequent call
+            to start (restarting the language server) can reuse it. To eventually stop the loop, call stop again
+            (with keep_loop=False).
         """
-        if not self.loop or not self.loop_thread:
-            raise MultilspyException("Language Server not started")
-            
-        asyncio.run_coroutine_threadsafe(self._server_context.__aexit__(None, None, None), loop=self.loop).result()
-        self.loop.call_soon_threadsafe(self.loop.stop)
-        self.loop_thread.join()
-        self.loop = None
-        self.loop_thread = None
+        if self.loop is None or self.loop_thread is None:
+            self.language_server.logger.log("Language Server not started (or already stopped), nothing to stop", logging.DEBUG)
+            return
+
+        atexit.unregister(self._stop_at_exit)
+        server_context, self._server_context = self._server_context, None
+        if self.loop.is_closed() or not self.loop_thread.is_alive():
+            # the loop can no longer process anything (e.g. its thread was terminated during interpreter shutdown),
+            # so submitting the shutdown to it would fail or block forever; we can only forget about it
+            self.language_server.logger.log(
+                "The event loop of the language server is no longer running; the server cannot be shut down cleanly",
+                logging.WARNING,
+            )
+            self._ready.clear()
+            if self.share_event_loop:
+                self._release_shared_loop()
+            self.loop = None
+            self.loop_thread = None
+        elif keep_loop:
+            if server_context is not None:
+                self._ready.clear()
+                asyncio.run_coroutine_threadsafe(server_context.__aexit__(None, None, None), loop=self.loop).result()
+        else:
+            self._stop_server_and_loop(server_context)
+        self.save_cache(async_flush=True)
         
-    def save_cache(self):
+    def _stop_at_exit(self) -> None:
+        """
+        Stops the language server upon interpreter exit and waits for the cache to be written, as the interpreter
+        does not wait for non-daemon threads that are started by atexit callbacks.
+        """
+        self.stop()
+        self._wait_for_cache_flush()
+
+    def __enter__(self) -> "SyncLanguageServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def save_cache(self, async_flush: bool = False):
         """
         Save the cache to a file.
+        If the language server is running, the cache is saved in the loop thread (which is the only thread that modifies it).
+
+        :param async_flush: whether to write the cache in a background thread and return immediately; only applicable
+            if the language server is not running. The (non-daemon) thread is waited for before the cache is accessed
+            again via this instance or the server is restarted, and the interpreter waits for it upon exit
+            (unless it is started by an atexit callback, see _stop_at_exit).
         """
-        self.language_server.save_cache()
+        self._wait_for_cache_flush()
+        with self._defining_symbol_cache_lock:
+            self._defining_symbol_cache.clear()
+        if not self.language_server._has_unsaved_cache_changes():
+            return
+        if self._ready.is_set():
+            self._run(self._call_async(self.language_server.save_cache))
+        elif async_flush:
+            self._cache_flush_thread = threading.Thread(target=self.language_server.save_cache, name="multilspy-cache-flush")
+            self._cache_flush_thread.start()
+        else:
+            self.language_server.save_cache()
+
+    def _wait_for_cache_flush(self) -> None:
+        if self._cache_flush_thread is not None:
+            self._cache_flush_thread.join()
+            self._cache_flush_thread = None
     
     def load_cache(self):
         """
         Load the cache from a file.
+        If the language server is running, the cache is loaded in the loop thread (which is the only thread that modifies it).
         """
-        self.language_server.load_cache()
+        self._wait_for_cache_flush()
+        with self._defining_symbol_cache_lock:
+            self._defining_symbol_cache.clear()
+        if self._ready.is_set():
+            self._run(self._call_async(self.language_server.load_cache))
+        else:
+            self.language_server.load_cache()
+
+    @staticmethod
+    async def _call_async(fn: Callable[[], T]) -> T:
+        return fn()
@@ -0,0 +1,177 @@
+"""
+Provides a LanguageServer that distributes requests over a pool of language server processes.
+"""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, ContextManager, List, Tuple, TypeVar, Union
+
+from . import multilspy_types
+from .language_server import LanguageServer, LSPFileBuffer
+from .multilspy_config import MultilspyConfig
+from .multilspy_logger import MultilspyLogger
+
+T = TypeVar("T")
+
+
+class LanguageServerPool(LanguageServer):
+    """
+    A LanguageServer which runs several instances of a language specific LanguageServer (each with its own server process)
+    and distributes the requests among them.
+
+    Each file is owned by a fixed member, which holds the document synchronization state of the file (whether it is open,
+    in-memory edits) as well as its document symbols. Requests which depend on this state are always handled by the owner.
+    Stateless requests (definition, references, hover) for files that are not open in their owner are handled by the
+    member with the fewest requests in flight instead, as every member can answer them from the file on disk.
+    The remaining requests (e.g. request_full_symbol_tree or request_referencing_symbols) are implemented in terms of
+    the file-specific requests and are thus distributed as well.
+
+    Do not instantiate this class directly. Use `LanguageServer.create` with `MultilspyConfig.server_pool_size` > 1 instead.
+    """
+
+    def __init__(
+        self,
+        members: List[LanguageServer],
+        config: MultilspyConfig,
+        logger: MultilspyLogger,
+        repository_root_path: str,
+    ):
+        """
+        :param members: the language servers (all for the same language and repository) to distribute the requests among.
+        :param config: the Multilspy configuration.
+        :param logger: the logger to use.
+        :param repository_root_path: the root path of the repository.
+        """
+        assert len(members) > 1, "A pool requires at least two language servers"
+        # the members load the document symbols cache themselves; during the base class initialization, there are no members yet
+        self._members: List[LanguageServer] = []
+        super().__init__(
+            config,
+            logger,
+            repository_root_path,
+            members[0].server.process_launch_info,
+            members[0].language_id,
+        )
+        self._members = members
+        self._inflight_counts = [0] * len(members)
+        """the number of stateless requests currently being processed by each member (by index)"""
+        # the pool does not communicate with a server process of its own
+        self.server = members[0].server
+
+    def _pick_member(self, relative_file_path: str) -> LanguageServer:
+        """
+        Returns the member that is responsible for the given file (which is always the same member for the same file).
+
+        :param relative_file_path: the relative path of the file.
+        """
+        return self._members[hash(self._rel_to_uri(relative_file_path)) % len(self._members)]
+
+    async def _request_stateless(self, relative_file_path: str, request: Callable[[LanguageServer], Awaitable[T]]) -> T:
+        """
+        Performs a request which does not depend on the document synchronization state of the given file, unless the
+        file is open in its owner. The request is performed by the owner if the file is open there, and by the least busy
+        member otherwise (preferring the owner among equally busy members).
+
+        :param relative_file_path: the relative path of the file the request refers to.
+        :param request: a function which performs the request on the given member.
+        """
+        owner = self._pick_member(relative_file_path)
+        owner_index = self._members.index(owner)
+        index = owner_index
+        if owner._rel_to_uri(relative_file_path) not in owner.open_file_buffers:
+            least_busy_index = min(range(len(self._members)), key=self._inflight_counts.__getitem__)
+            if self._inflight_counts[least_busy_index] < self._inflight_counts[owner_index]:
+                index = least_busy_index
+        self._inflight_counts[index] += 1
+        try:
+            return await request(self._members[index])
+        finally:
+            self._inflight_counts[index] -= 1
+
+    @asynccontextmanager
+    async def start_server(self) -> AsyncIterator["LanguageServerPool"]:
+        """
+        Starts all language servers in the pool (concurrently) and yields the pool.
+        """
+        async with AsyncExitStack() as stack:
+            self.logger.log(f"Starting a pool of {len(self._members)} language servers", logging.INFO)
+            # if a member fails to start, we still wait for the others (rather than cancelling them, which could leave their
+            # processes running), such that all members that were started are registered in the stack and can be stopped
+            results = await asyncio.gather(
+                *(stack.enter_async_context(member.start_server()) for member in self._members), return_exceptions=True
+            )
+            failures = [result for result in results if isinstance(result, BaseException)]
+            if failures:
+                # the started members are stopped regularly (the servers' contexts skip the shutdown if exited with an exception)
+                await stack.aclose()
+                raise failures[0]
+            self.completions_available.set()
+            async with super().start_server():
+                yield self
+
+    def open_file(self, relative_file_path: str) -> ContextManager[LSPFileBuffer]:
+        return self._pick_member(relative_file_path).open_file(relative_file_path)
+
+    def insert_text_at_position(self, relative_file_path: str, line: int, column: int, text_to_be_inserted: str) -> multilspy_types.Position:
+        return self._pick_member(relative_file_path).insert_text_at_position(relative_file_path, line, column, text_to_be_inserted)
+
+    def delete_text_between_positions(
+        self, relative_file_path: str, start: multilspy_types.Position, end: multilspy_types.Position
+    ) -> str:
+        return self._pick_member(relative_file_path).delete_text_between_positions(relative_file_path, start, end)
+
+    def batch_edits(self, relative_file_path: str) -> ContextManager[None]:
+        return self._pick_member(relative_file_path).batch_edits(relative_file_path)
+
+    def _has_unsaved_edits(self, relative_file_path: str) -> bool:
+        return self._pick_member(relative_file_path)._has_unsaved_edits(relative_file_path)
+
+    async def request_definition(self, relative_file_path: str, line: int, column: int) -> List[multilspy_types.Location]:
+        return await self._request_stateless(relative_file_path, lambda member: member.request_definition(relative_file_path, line, column))
+
+    async def request_references(self, relative_file_path: str, line: int, column: int) -> List[multilspy_types.Location]:
+        return await self._request_stateless(relative_file_path, lambda member: member.request_references(relative_file_path, line, column))
+
+    async def request_completions(
+        self, relative_file_path: str, line: int, column: int, allow_incomplete: bool = False
+    ) -> List[multilspy_types.CompletionItem]:
+        return await self._pick_member(relative_file_path).request_completions(relative_file_path, line, column, allow_incomplete)
+
+    async def request_document_symbols(
+        self, relative_file_path: str, include_body: bool = False
+    ) -> Tuple[List[multilspy_types.UnifiedSymbolInformation], List[multilspy_types.UnifiedSymbolInformation]]:
+        return await self._pick_member(relative_file_path).request_document_symbols(relative_file_path, include_body=include_body)
+
+    async def request_hover(self, relative_file_path: str, line: int, column: int) -> Union[multilspy_types.Hover, None]:
+        return await self._request_stateless(relative_file_path, lambda member: member.request_hover(relative_file_path, line, column))
+
+    def _has_unsaved_cache_changes(self) -> bool:
+        return any(member._has_unsaved_cache_changes() for member in self._members)
+
+    def save_cache(self):
+        # Each member holds the entries of the files it is responsible for as well as (possibly outdated) entries
+        # for other files that were loaded from disk, so we collect each entry from the responsible member.
+        self._document_symbols_cache = {}
+        self._document_symbols_file_stats = {}
+        self._dirty_cache_keys = set()
+        self._cache_has_changed = False
+        for member in self._members:
+            for cache_key, entry in member._document_symbols_cache.items():
+                relative_file_path = cache_key.rsplit("-", 1)[0]
+                if self._pick_member(relative_file_path) is member:
+                    self._document_symbols_cache[cache_key] = entry
+                    if cache_key in member._document_symbols_file_stats:
+                        self._document_symbols_file_stats[cache_key] = member._document_symbols_file_stats[cache_key]
+                    if cache_key in member._dirty_cache_keys:
+                        self._dirty_cache_keys.add(cache_key)
+            if member._cache_has_changed:
+                self._cache_has_changed = True
+        super().save_cache()
+        for member in self._members:
+            member._dirty_cache_keys.clear()
+            member._cache_has_changed = False
+
+    def load_cache(self):
+        for member in self._members:
+            member.load_cache()
@@ -33,11 +33,17 @@ import dataclasses
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .lsp_requests import LspNotification, LspRequest
 from .lsp_types import ErrorCodes
 
+try:
+    # optional, considerably faster JSON encoding of outgoing and decoding of incoming messages
+    import orjson
+except ImportError:
+    orjson = None
+
 StringDict = Dict[str, Any]
 PayloadLike = Union[List[StringDict], StringDict, None]
 CONTENT_LENGTH = "Content-Length: "
@@ -97,8 +103,22 @@ class StopLoopException(Exception):
     pass
 
 
+def _encode_payload(payload: PayloadLike) -> bytes:
+    if orjson is not None:
+        # orjson produces compact UTF-8 directly; non-str keys are stringified like the json module does
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, check_circular=False, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+
+
+def _decode_payload(body: bytes) -> PayloadLike:
+    if orjson is not None:
+        # orjson parses the UTF-8 bytes directly; its JSONDecodeError is a subclass of json.JSONDecodeError
+        return orjson.loads(body)
+    return json.loads(body)
+
+
 def create_message(payload: PayloadLike):
-    body = json.dumps(payload, check_circular=False, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+    body = _encode_payload(payload)
     return (
         f"Content-Length: {len(body)}\r\n".encode(ENCODING),
         "Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n\r\n".encode(ENCODING),
@@ -197,6 +217,10 @@ class LanguageServerHandler:
         self.tasks = {}
         self.task_counter = 0
         self.loop = None
+        # message frames that are yet to be written to the server's stdin, see _write_message
+        self._outgoing_frames: List[bytes] = []
+        # resolved once the queued frames have been written; None if no flush is scheduled
+        self._flush_future: Optional[asyncio.Future] = None
 
     async def start(self) -> None:
         """
@@ -224,7 +248,7 @@ class LanguageServerHandler:
             error_message = stderr_data.decode('utf-8', errors='replace')
             raise RuntimeError(f"Process terminated immediately with code {self.process.returncode}. Error: {error_message}")
 
-        self.loop = asyncio.get_event_loop()
+        self.loop = asyncio.get_running_loop()
         self.tasks[self.task_counter] = self.loop.create_task(self.run_forever())
         self.task_counter += 1
         self.tasks[self.task_counter] = self.loop.create_task(self.run_forever_stderr())
@@ -239,6 +263,9 @@ class LanguageServerHandler:
 
         self.tasks = {}
 
+        # write the messages that are still queued (e.g. the exit notification) while the process is available
+        self._flush_outgoing_frames()
+
         process = self.process
         self.process = None
 
@@ -295,7 +322,9 @@ class LanguageServerHandler:
                     continue
                 body = await self.process.stdout.readexactly(num_bytes)
 
-                self.tasks[self.task_counter] = asyncio.get_event_loop().create_task(self._handle_body(body))
+                # messages are handled in tasks of their own, as handlers may wait for further messages (e.g. a response
+                # handler waiting for the requester to release its condition)
+                self.tasks[self.task_counter] = self.loop.create_task(self._handle_body(body))
                 self.task_counter += 1
         except (BrokenPipeError, ConnectionResetError, StopLoopException):
             pass
@@ -319,7 +348,7 @@ class LanguageServerHandler:
         Parse the body text received from the language server process and invoke the appropriate handler
         """
         try:
-            await self._receive_payload(json.loads(body))
+            await self._receive_payload(_decode_payload(body))
         except IOError as ex:
             self._log(f"malformed {ENCODING}: {ex}")
         except UnicodeDecodeError as ex:
@@ -356,19 +385,13 @@ class LanguageServerHandler:
         """
         Send response to the given request id to the server with the given parameters
         """
-        self.tasks[self.task_counter] = asyncio.get_event_loop().create_task(
-            self._send_payload(make_response(request_id, params))
-        )
-        self.task_counter += 1
+        self._send_payload_sync(make_response(request_id, params))
 
     def send_error_response(self, request_id: Any, err: Error) -> None:
         """
         Send error response to the given request id to the server with the given error
         """
-        self.tasks[self.task_counter] = asyncio.get_event_loop().create_task(
-            self._send_payload(make_error_response(request_id, err))
-        )
-        self.task_counter += 1
+        self._send_payload_sync(make_error_response(request_id, err))
 
     async def send_request(self, method: str, params: Optional[dict] = None) -> None:
         """
@@ -394,7 +417,18 @@ class LanguageServerHandler:
         msg = create_message(payload)
         if self.logger:
             self.logger("client", "server", payload)
-        self.process.stdin.writelines(msg)
+        if self.loop is not None and not self._in_loop_thread():
+            # the stream may only be written to from the event loop's thread (concurrent writes from another
+            # thread can corrupt the transport's buffer); scheduling the write keeps the order of messages intact
+            self.loop.call_soon_threadsafe(self._write_message, msg)
+        else:
+            self._write_message(msg)
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
 
     async def _send_payload(self, payload: StringDict) -> None:
         """
@@ -405,8 +439,41 @@ class LanguageServerHandler:
         msg = create_message(payload)
         if self.logger:
             self.logger("client", "server", payload)
-        self.process.stdin.writelines(msg)
-        await self.process.stdin.drain()
+        self._write_message(msg)
+        # wait for the (coalesced) write that includes the message, such that draining applies backpressure to it;
+        # the future is shared by all messages of the write, so it is shielded from the cancellation of this coroutine
+        await asyncio.shield(self._flush_future)
+        if self.process and self.process.stdin:
+            await self.process.stdin.drain()
+
+    def _write_message(self, msg: Tuple[bytes, ...]) -> None:
+        """
+        Queues the frames of the given message for writing to the server's stdin. Must be called from the event loop's thread.
+
+        The LSP does not support JSON-RPC batches, but we can still coalesce the writes: all messages that are queued
+        within the same iteration of the event loop (e.g. the requests of concurrently gathered coroutines or the
+        notifications that precede a request) are written with a single write call, in the order in which they were queued.
+        """
+        self._outgoing_frames.extend(msg)
+        if self._flush_future is None:
+            self._flush_future = self.loop.create_future()
+            self.loop.call_soon(self._flush_outgoing_frames)
+
+    def _flush_outgoing_frames(self) -> None:
+        """
+        Writes the queued frames to the server's stdin (dropping them if the process is no longer available).
+        """
+        flush_future = self._flush_future
+        self._flush_future = None
+        frames = self._outgoing_frames
+        self._outgoing_frames = []
+        if frames:
+            if self.process and self.process.stdin:
+                self.process.stdin.write(b"".join(frames))
+            else:
+                log.warning("Dropping %d bytes of outgoing messages, as the language server process is not running", sum(map(len, frames)))
+        if flush_future is not None and not flush_future.done():
+            flush_future.set_result(None)
 
     def on_request(self, method: str, cb) -> None:
         """
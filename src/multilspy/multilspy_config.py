@@ -4,6 +4,7 @@ Configuration parameters for Multilspy.
 import fnmatch
 from enum import Enum
 from dataclasses import dataclass
+from typing import Optional
 
 
 class FilenameMatcher:
@@ -66,6 +67,25 @@ class MultilspyConfig:
     """
     code_language: Language
     trace_lsp_communication: bool = False
+    server_pool_size: int = 1
+    """
+    The number of language server processes to run. If greater than 1, requests are distributed among the processes,
+    with all requests concerning the same file being handled by the same process.
+    """
+    request_timeout: Optional[float] = None
+    """
+    The maximum number of seconds a SyncLanguageServer waits for the result of a request (None to wait indefinitely).
+    """
+    share_event_loop: bool = False
+    """
+    Whether a SyncLanguageServer shall run on an event loop that is shared with other SyncLanguageServer instances
+    instead of starting an event loop (and thread) of its own.
+    """
+    pin_loop_thread: bool = False
+    """
+    Whether the thread running the event loop of a SyncLanguageServer shall be pinned to a single CPU core (and have
+    its priority raised, if permitted), reducing the latency of handing requests to the loop. Linux only.
+    """
 
     @classmethod
     def from_dict(cls, env: dict):
@@ -5,7 +5,7 @@ This file contains various utility functions like I/O operations, handling paths
 import gzip
 import logging
 import os
-from typing import Tuple
+from typing import List, Optional, Tuple
 import requests
 import shutil
 import uuid
@@ -67,6 +67,100 @@ class TextUtils:
             c += len(text_to_be_inserted)
         return (l, c)
 
+class PieceTable:
+    """
+    A text buffer that supports efficient insertions and deletions.
+
+    The text is represented as a sequence of pieces, each referencing a range of an immutable string:
+    either the original text or one of the inserted texts (which are never modified).
+    Edits thus only split and splice the (short) list of pieces instead of copying the full text,
+    which is materialized only when it is requested (and memoized until the next edit).
+    """
+    def __init__(self, text: str) -> None:
+        self._pieces: List[Tuple[str, int, int]] = [(text, 0, len(text))] if text else []
+        """Pieces given as (source string, start index, end index)"""
+        self._length = len(text)
+        self._text: Optional[str] = text
+
+    def __len__(self) -> int:
+        return self._length
+
+    def get_text(self) -> str:
+        """
+        Returns the full text
+        """
+        if self._text is None:
+            self._text = "".join(source[start:end] for source, start, end in self._pieces)
+        return self._text
+
+    def _split_at(self, index: int) -> int:
+        """
+        Ensures that a piece boundary exists at the given index of the text and returns the position
+        in the list of pieces at which the pieces starting at the given index begin
+        """
+        if not 0 <= index <= self._length:
+            raise IndexError(f"Index {index} out of range for text of length {self._length}")
+        offset = 0
+        for i, (source, start, end) in enumerate(self._pieces):
+            if index == offset:
+                return i
+            piece_length = end - start
+            if index < offset + piece_length:
+                split_point = start + index - offset
+                self._pieces[i : i + 1] = [(source, start, split_point), (source, split_point, end)]
+                return i + 1
+            offset += piece_length
+        return len(self._pieces)
+
+    def insert(self, index: int, text: str) -> None:
+        """
+        Inserts the given text at the given index
+        """
+        if not text:
+            return
+        i = self._split_at(index)
+        self._pieces.insert(i, (text, 0, len(text)))
+        self._length += len(text)
+        self._text = None
+
+    def delete(self, start_index: int, end_index: int) -> str:
+        """
+        Deletes the text between the given indices and returns it
+        """
+        if end_index <= start_index:
+            return ""
+        i = self._split_at(start_index)
+        j = self._split_at(end_index)
+        deleted_text = "".join(source[start:end] for source, start, end in self._pieces[i:j])
+        del self._pieces[i:j]
+        self._length -= end_index - start_index
+        self._text = None
+        return deleted_text
+
+    def get_index_from_line_col(self, line: int, col: int) -> int:
+        """
+        Returns the index of the given zero-indexed line and column number in the text
+        (same semantics as TextUtils.get_index_from_line_col), without materializing the text
+        """
+        offset = 0
+        for source, start, end in self._pieces:
+            if line == 0:
+                break
+            num_newlines = source.count("\n", start, end)
+            if num_newlines < line:
+                line -= num_newlines
+                offset += end - start
+                continue
+            pos = start - 1
+            for _ in range(line):
+                pos = source.find("\n", pos + 1, end)
+            offset += pos + 1 - start
+            line = 0
+            break
+        assert line == 0, f"Line is out of range for text of length {self._length}"
+        return offset + col
+
+
 class PathUtils:
     """
     Utilities for platform-agnostic path operations.
@@ -89,6 +183,40 @@ class PathUtils:
         host = "{0}{0}{mnt}{0}".format(os.path.sep, mnt=parsed.netloc)
         return os.path.normpath(os.path.join(host, url2pathname(unquote(parsed.path))))
 
+    @staticmethod
+    def uris_to_relpaths(uris: List[str], root: str) -> List[Tuple[str, str]]:
+        """
+        Converts a list of URIs to pairs of absolute paths (as computed by uri_to_path) and paths relative to the given root.
+        Plain local file URIs on posix systems are converted directly, without parsing each URI;
+        relative paths of files within the root are obtained by stripping the root prefix.
+        If a path cannot be made relative to the root, the absolute path is used as the relative path.
+
+        :param uris: the URIs to convert.
+        :param root: the root directory that the relative paths refer to.
+        """
+        from urllib.parse import unquote
+        from urllib.request import url2pathname
+
+        local_file_uri_prefix = "file:///"
+        fast_path_available = os.name == "posix"
+        root_prefix = os.path.join(os.path.abspath(root), "")
+        result = []
+        for uri in uris:
+            if fast_path_available and uri.startswith(local_file_uri_prefix) and "?" not in uri and "#" not in uri:
+                # strip "file://", keeping the leading slash of the path
+                absolute_path = os.path.normpath(url2pathname(unquote(uri[7:])))
+            else:
+                absolute_path = PathUtils.uri_to_path(uri)
+            if absolute_path.startswith(root_prefix):
+                relative_path = absolute_path[len(root_prefix):]
+            else:
+                try:
+                    relative_path = os.path.relpath(absolute_path, root)
+                except ValueError:
+                    relative_path = absolute_path
+            result.append((absolute_path, relative_path))
+        return result
+
 class FileUtils:
     """
     Utility functions for file operations.
@@ -290,7 +290,8 @@ class SymbolManager:
     @contextmanager
     def _edited_file(self, relative_path: str) -> Iterator[None]:
         with self.lang_server.open_file(relative_path) as file_buffer:
-            yield
+            with self.lang_server.batch_edits(relative_path):
+                yield
             root_path = self.lang_server.language_server.repository_root_path
             abs_path = os.path.join(root_path, relative_path)
             with open(abs_path, "w") as f:
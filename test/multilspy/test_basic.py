@@ -5,9 +5,22 @@ These tests validate the functionality of the language server APIs
 like request_references using the test repository.
 """
 
+import asyncio
+import concurrent.futures
 import os
+import shutil
+import subprocess
+import sys
+import textwrap
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
 
 from multilspy.language_server import SyncLanguageServer
+from multilspy.multilspy_config import Language, MultilspyConfig
+from multilspy.multilspy_exceptions import MultilspyException
+from multilspy.multilspy_logger import MultilspyLogger
 from serena.text_utils import LineType
 
 
@@ -210,3 +223,171 @@ class TestLanguageServerBasics:
         no_match_pattern = r"def\s+this_method_does_not_exist\s*\([^)]*\):"
         matches = language_server.search_files_for_pattern(no_match_pattern)
         assert len(matches) == 0
+
+    def test_content_hash_follows_edits(self, language_server: SyncLanguageServer):
+        """Test that the content hash of an open file is updated when the file is edited in memory."""
+        file_path = os.path.join("test_repo", "models.py")
+        with language_server.open_file(file_path) as file_buffer:
+            original_hash = file_buffer.content_hash
+            original_lines = file_buffer.lines
+            end = language_server.insert_text_at_position(file_path, 0, 0, "# edited\n")
+            assert file_buffer.content_hash != original_hash
+            assert file_buffer.lines == ["# edited"] + original_lines
+            assert [file_buffer.get_line(i) for i in range(len(file_buffer.lines))] == file_buffer.lines
+            language_server.delete_text_between_positions(file_path, {"line": 0, "character": 0}, end)
+            assert file_buffer.content_hash == original_hash
+
+    def test_batch_edits(self, language_server: SyncLanguageServer):
+        """Test that edits made within batch_edits are applied and sent to the language server."""
+        file_path = os.path.join("test_repo", "nested.py")
+        with language_server.open_file(file_path) as file_buffer:
+            original_contents = file_buffer.contents
+            with language_server.batch_edits(file_path):
+                language_server.insert_text_at_position(file_path, 0, 0, "def batch_inserted_function():\n")
+                language_server.insert_text_at_position(file_path, 1, 0, "    pass\n")
+            assert file_buffer.contents == "def batch_inserted_function():\n    pass\n" + original_contents
+
+            symbols, _ = language_server.request_document_symbols(file_path)
+            assert "batch_inserted_function" in [symbol["name"] for symbol in symbols]
+
+    def test_document_symbols_cache_persists_file_stats(self, language_server: SyncLanguageServer):
+        """Test that cached document symbols and the file stats used to validate them survive saving and loading the cache."""
+        file_path = os.path.join("test_repo", "services.py")
+        symbols, _ = language_server.request_document_symbols(file_path)
+        language_server.save_cache()
+
+        ls = language_server.language_server
+        # saving writes all changed entries, such that there is nothing left to write
+        assert not ls._dirty_cache_keys
+        ls._document_symbols_cache = {}
+        ls._document_symbols_file_stats = {}
+        ls.load_cache()
+
+        # entries are loaded lazily, upon the first request for the respective file
+        cache_key = f"{file_path}-False"
+        assert cache_key not in ls._document_symbols_cache
+        cached_symbols, _ = language_server.request_document_symbols(file_path)
+        assert cache_key in ls._document_symbols_file_stats
+        assert [s["name"] for s in cached_symbols] == [s["name"] for s in symbols]
+
+    def test_request_timeout(self, language_server: SyncLanguageServer):
+        """Test that waiting for a result is aborted (and the pending coroutine cancelled) once the timeout expires."""
+        with pytest.raises(concurrent.futures.TimeoutError):
+            language_server._run(asyncio.sleep(10), timeout=0.1)
+        # the language server remains usable afterwards
+        symbols, _ = language_server.request_document_symbols(os.path.join("test_repo", "models.py"))
+        assert len(symbols) > 0
+
+    def test_requests_fail_fast_when_not_started(self, repo_path: Path):
+        """Test that requests to a language server that was not started fail immediately."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+        file_path = os.path.join("test_repo", "services.py")
+        with pytest.raises(MultilspyException):
+            server.request_defining_symbol(file_path, 20, 15)
+        with pytest.raises(MultilspyException):
+            server.request_hover(file_path, 20, 15)
+
+    def test_restart_reuses_event_loop(self, repo_path: Path):
+        """Test that a language server stopped with keep_loop=True can be restarted on the same event loop."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+        file_path = os.path.join("test_repo", "models.py")
+        server.start()
+        loop, thread = server.loop, server.loop_thread
+        server.stop(keep_loop=True)
+        assert thread.is_alive()
+        with pytest.raises(MultilspyException):
+            server.request_hover(file_path, 31, 6)
+
+        with server:
+            assert (server.loop, server.loop_thread) == (loop, thread)
+            assert len(server.request_references(file_path, 31, 6)) > 1
+        assert not thread.is_alive()
+
+    def test_start_can_be_retried_after_failure(self, repo_path: Path, monkeypatch):
+        """Test that start may be called again if starting the language server failed."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+
+        @asynccontextmanager
+        async def failing_start_server():
+            raise RuntimeError("the language server could not be started")
+            yield
+
+        with monkeypatch.context() as patch:
+            patch.setattr(server.language_server, "start_server", failing_start_server)
+            with pytest.raises(RuntimeError):
+                server.start()
+        assert server._server_context is None
+
+        with server:
+            assert len(server.request_references(os.path.join("test_repo", "models.py"), 31, 6)) > 1
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU affinity is not supported on this platform")
+    def test_restart_with_pinned_loop_thread(self, repo_path: Path):
+        """Test that a language server restarted on a pinned loop thread does not inherit the thread's affinity and priority."""
+        config = MultilspyConfig(code_language=Language.PYTHON, pin_loop_thread=True)
+        server = SyncLanguageServer.create(config, MultilspyLogger(), str(repo_path))
+        server.start()
+        server.stop(keep_loop=True)
+        with server:
+            pid = server.language_server.server.process.pid
+            assert os.sched_getaffinity(pid) == os.sched_getaffinity(0)
+            assert os.getpriority(os.PRIO_PROCESS, pid) == os.getpriority(os.PRIO_PROCESS, 0)
+            assert server._loop_thread_unpinned_state is not None
+
+    def test_stop_with_terminated_loop(self, repo_path: Path):
+        """Test that stop does not block if the event loop was terminated (e.g. during interpreter shutdown)."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+        server._start_loop()
+        server.loop.call_soon_threadsafe(server.loop.stop)
+        server.loop_thread.join()
+
+        server.stop()
+        assert server.loop is None and server.loop_thread is None
+
+    def test_stop_twice(self, repo_path: Path):
+        """Test that stopping a language server that was already stopped does nothing."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+        server.start()
+        server.stop()
+        server.stop()
+        assert server.loop is None and server.loop_thread is None
+
+    def test_stop_at_exit_after_stop(self, repo_path: Path):
+        """Test that the stop upon interpreter exit does nothing if the language server was already stopped."""
+        server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), str(repo_path))
+        server.start()
+        server.stop()
+        server._stop_at_exit()
+        assert server.loop is None and server.loop_thread is None
+
+    def test_cache_is_saved_at_exit(self, repo_path: Path, tmp_path: Path):
+        """Test that the cache is written if the language server is left to be stopped upon interpreter exit."""
+        repo_copy = tmp_path / "repo"
+        shutil.copytree(repo_path, repo_copy, ignore=shutil.ignore_patterns(".serena"))
+        script = textwrap.dedent(
+            f"""
+            import os
+            from multilspy.language_server import SyncLanguageServer
+            from multilspy.multilspy_config import Language, MultilspyConfig
+            from multilspy.multilspy_logger import MultilspyLogger
+
+            server = SyncLanguageServer.create(MultilspyConfig(code_language=Language.PYTHON), MultilspyLogger(), {str(repo_copy)!r})
+            server.start()
+            server.request_document_symbols(os.path.join("test_repo", "models.py"))
+            """
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=120)
+
+        cache_dir = repo_copy / ".serena" / "cache" / "document_symbols"
+        assert cache_dir.is_dir() and any(cache_dir.iterdir())
+
+    def test_shared_event_loop(self):
+        """Test that the shared event loop is started once, reused, and stopped once it is no longer used."""
+        loop, thread = SyncLanguageServer._acquire_shared_loop()
+        assert thread.is_alive()
+        assert SyncLanguageServer._acquire_shared_loop() == (loop, thread)
+
+        SyncLanguageServer._release_shared_loop()
+        assert thread.is_alive()
+        SyncLanguageServer._release_shared_loop()
+        assert not thread.is_alive()
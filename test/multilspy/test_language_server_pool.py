@@ -0,0 +1,103 @@
+"""
+Tests for distributing requests over a pool of language servers.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+
+from multilspy.language_server import SyncLanguageServer
+from multilspy.language_server_pool import LanguageServerPool
+from multilspy.multilspy_config import Language, MultilspyConfig
+from multilspy.multilspy_logger import MultilspyLogger
+
+
+@pytest.fixture(scope="module")
+def pooled_language_server(repo_path: Path):
+    config = MultilspyConfig(code_language=Language.PYTHON, server_pool_size=2, share_event_loop=True)
+    with SyncLanguageServer.create(config, MultilspyLogger(), str(repo_path)) as server:
+        yield server
+
+
+class TestLanguageServerPool:
+    def test_requests_are_dispatched_to_members(self, pooled_language_server: SyncLanguageServer):
+        """Test that the pool answers requests like a single language server, with each file handled by a fixed member."""
+        pool = pooled_language_server.language_server
+        assert isinstance(pool, LanguageServerPool)
+
+        file_path = os.path.join("test_repo", "models.py")
+        assert pool._pick_member(file_path) is pool._pick_member(file_path)
+
+        symbols, _ = pooled_language_server.request_document_symbols(file_path)
+        assert "User" in [symbol["name"] for symbol in symbols]
+        assert len(pooled_language_server.request_references(file_path, 31, 6)) > 1
+
+    def test_stateless_requests_go_to_least_busy_member(self, pooled_language_server: SyncLanguageServer):
+        """Test that stateless requests for files that are not open are answered by a less busy member than the owner."""
+        pool = pooled_language_server.language_server
+        assert isinstance(pool, LanguageServerPool)
+        file_path = os.path.join("test_repo", "models.py")
+        owner_index = pool._members.index(pool._pick_member(file_path))
+        expected_references = pooled_language_server.request_references(file_path, 31, 6)
+
+        # pretend that the owner is busy, such that the request is dispatched to another member
+        pool._inflight_counts[owner_index] += 1
+        try:
+            references = pooled_language_server.request_references(file_path, 31, 6)
+        finally:
+            pool._inflight_counts[owner_index] -= 1
+
+        assert sorted(r["uri"] for r in references) == sorted(r["uri"] for r in expected_references)
+        assert pool._inflight_counts == [0] * len(pool._members)
+
+    def test_stateless_requests_for_open_files_go_to_owner(self, pooled_language_server: SyncLanguageServer, monkeypatch):
+        """Test that stateless requests for files that are open in their owner are answered by the owner, even if it is busier."""
+        pool = pooled_language_server.language_server
+        assert isinstance(pool, LanguageServerPool)
+        file_path = os.path.join("test_repo", "models.py")
+        owner = pool._pick_member(file_path)
+        owner_index = pool._members.index(owner)
+        answering_members = []
+        for member in pool._members:
+            request_references = member.request_references
+
+            async def record_request_references(*args, _member=member, _request_references=request_references):
+                answering_members.append(_member)
+                return await _request_references(*args)
+
+            monkeypatch.setattr(member, "request_references", record_request_references)
+
+        with pooled_language_server.open_file(file_path):
+            # the edit is only known to the owner, so the other members would answer based on outdated content
+            pooled_language_server.insert_text_at_position(file_path, 0, 0, "\n")
+            pool._inflight_counts[owner_index] += 1
+            try:
+                references = pooled_language_server.request_references(file_path, 32, 6)
+            finally:
+                pool._inflight_counts[owner_index] -= 1
+
+        assert answering_members == [owner]
+        assert len(references) > 1
+
+    def test_failed_start_stops_started_members(self, repo_path: Path, monkeypatch):
+        """Test that the members which were started are stopped again if another member fails to start."""
+        config = MultilspyConfig(code_language=Language.PYTHON, server_pool_size=2)
+        server = SyncLanguageServer.create(config, MultilspyLogger(), str(repo_path))
+        pool = server.language_server
+        assert isinstance(pool, LanguageServerPool)
+
+        @asynccontextmanager
+        async def failing_start_server():
+            raise RuntimeError("the language server could not be started")
+            yield
+
+        monkeypatch.setattr(pool._members[1], "start_server", failing_start_server)
+        with pytest.raises(RuntimeError):
+            server.start()
+        server.stop()
+
+        started_member = pool._members[0]
+        assert not started_member.server_started
+        assert started_member.server.process is None
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+from multilspy.language_server import LSPFileBuffer
+from multilspy.multilspy_utils import PathUtils, PieceTable, TextUtils
+
+
+class TestPieceTable:
+    def test_insert_and_delete(self):
+        """Test that edits on a piece table yield the same text as the equivalent string operations."""
+        text = "def f():\n    return 1\n"
+        table = PieceTable(text)
+
+        table.insert(0, "# comment\n")
+        table.insert(len(table), "x = f()\n")
+        deleted = table.delete(10, 18)
+        expected = ("# comment\n" + text + "x = f()\n")[:10] + ("# comment\n" + text + "x = f()\n")[18:]
+
+        assert deleted == "def f():"
+        assert table.get_text() == expected
+        assert len(table) == len(expected)
+
+    def test_get_index_from_line_col(self):
+        """Test that index computation matches TextUtils.get_index_from_line_col after edits."""
+        table = PieceTable("a\nbb\nccc\n")
+        table.insert(3, "X\nY")
+        text = table.get_text()
+
+        for line in range(text.count("\n") + 1):
+            assert table.get_index_from_line_col(line, 0) == TextUtils.get_index_from_line_col(text, line, 0)
+
+
+class TestPathUtils:
+    def test_uris_to_relpaths(self, tmp_path):
+        """Test that the batched conversion agrees with uri_to_path and os.path.relpath."""
+        root = str(tmp_path)
+        paths = [os.path.join(root, "a.py"), os.path.join(root, "sub dir", "b%c.py"), os.path.join(os.path.dirname(root), "other.py")]
+        uris = [Path(p).as_uri() for p in paths]
+
+        result = PathUtils.uris_to_relpaths(uris, root)
+
+        assert result == [(PathUtils.uri_to_path(uri), os.path.relpath(PathUtils.uri_to_path(uri), root)) for uri in uris]
+
+
+class TestLSPFileBuffer:
+    def test_content_hash_after_assigning_contents(self):
+        """Test that assigning the contents invalidates the content hash."""
+        buffer = LSPFileBuffer("file:///a.py", "x = 1\n", 0, "python", 1)
+        assert buffer.content_hash == LSPFileBuffer("file:///a.py", "x = 1\n", 0, "python", 1).content_hash
+
+        buffer.contents = "x = 2\n"
+
+        assert buffer.content_hash == LSPFileBuffer("file:///a.py", "x = 2\n", 0, "python", 1).content_hash
+
+    def test_content_hash_reuses_digests_of_unchanged_chunks(self, monkeypatch):
+        """Test that recomputing the content hash after an edit only hashes the chunks from the edited one onwards."""
+        monkeypatch.setattr(LSPFileBuffer, "HASH_CHUNK_SIZE", 8)
+        buffer = LSPFileBuffer("file:///a.py", "abcdefgh" * 5, 0, "python", 1)
+        buffer.content_hash
+
+        hashed_chunks = []
+        compute_chunk_digest = LSPFileBuffer._compute_chunk_digest
+
+        def record_chunk_digest(chunk: str) -> bytes:
+            hashed_chunks.append(chunk)
+            return compute_chunk_digest(chunk)
+
+        monkeypatch.setattr(LSPFileBuffer, "_compute_chunk_digest", staticmethod(record_chunk_digest))
+        buffer.insert_text(26, "XY")
+        buffer.version += 1
+        content_hash = buffer.content_hash
+
+        contents = buffer.contents
+        assert hashed_chunks == [contents[i : i + 8] for i in range(24, len(contents), 8)]
+        assert content_hash == LSPFileBuffer("file:///a.py", contents, 0, "python", 1).content_hash
@@ -7,6 +7,7 @@ These tests focus on the following methods:
 """
 
 import os
+from pathlib import Path
 
 from multilspy.language_server import SyncLanguageServer
 from multilspy.multilspy_types import SymbolKind
@@ -29,6 +30,38 @@ class TestLanguageServerSymbols:
         if "body" in containing_symbol:
             assert containing_symbol["body"].strip().startswith("def create_user(self")
 
+    def test_request_containing_symbol_cached(self, language_server: SyncLanguageServer, repo_path: Path, monkeypatch):
+        """Test that repeated requests for the same position are answered from the cache, unless the file was edited."""
+        file_path = os.path.join("test_repo", "services.py")
+        containing_symbol = language_server.request_containing_symbol(file_path, 17, 20)
+        assert containing_symbol is not None
+        assert language_server.request_containing_symbol(file_path, 17, 20) is containing_symbol
+
+        # cache hits for files without in-memory edits do not require reading the file
+        with monkeypatch.context() as patch:
+            patch.setattr(language_server.language_server, "open_file", None)
+            assert language_server.request_containing_symbol(file_path, 17, 20) is containing_symbol
+
+        # changing the file on disk (as indicated by its modification time) leads to a new entry
+        absolute_path = repo_path / file_path
+        stat_result = absolute_path.stat()
+        changed_mtime_ns = stat_result.st_mtime_ns + 1_000_000_000
+        os.utime(absolute_path, ns=(stat_result.st_atime_ns, changed_mtime_ns))
+        try:
+            assert language_server.request_containing_symbol(file_path, 17, 20)["name"] == "create_user"
+            cache_key = (file_path, (changed_mtime_ns, stat_result.st_size), 17, 20, False)
+            assert cache_key in language_server.language_server._containing_symbol_cache
+        finally:
+            os.utime(absolute_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+        with language_server.open_file(file_path):
+            language_server.insert_text_at_position(file_path, 0, 0, "\n")
+            shifted_symbol = language_server.request_containing_symbol(file_path, 18, 20)
+            assert shifted_symbol is not None
+            assert shifted_symbol["name"] == "create_user"
+            start_line = containing_symbol["location"]["range"]["start"]["line"]
+            assert shifted_symbol["location"]["range"]["start"]["line"] == start_line + 1
+
     def test_references_to_variables(self, language_server: SyncLanguageServer):
         """Test request_referencing_symbols for a variable."""
         file_path = os.path.join("test_repo", "variables.py")
@@ -226,6 +259,39 @@ class TestLanguageServerSymbols:
         # Should return None for positions with no symbol
         assert defining_symbol is None
 
+    def test_request_defining_symbol_cached(self, language_server: SyncLanguageServer, repo_path: Path):
+        """Test that defining symbols are cached until the file is changed on disk."""
+        file_path = os.path.join("test_repo", "services.py")
+        defining_symbol = language_server.request_defining_symbol(file_path, 20, 15)
+        assert defining_symbol is not None
+        cached_defining_symbol = language_server.request_defining_symbol(file_path, 20, 15)
+        assert cached_defining_symbol == defining_symbol
+        # callers get a copy, such that modifying the result does not affect the cache
+        cached_defining_symbol["name"] = "modified"
+        assert language_server.request_defining_symbol(file_path, 20, 15)["name"] == "User"
+        stamp = language_server._defining_symbol_cache[(file_path, 20, 15, False)][0]
+
+        # changing the modification time invalidates the entry
+        absolute_path = repo_path / file_path
+        stat_result = absolute_path.stat()
+        os.utime(absolute_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        try:
+            assert language_server.request_defining_symbol(file_path, 20, 15)["name"] == "User"
+            assert language_server._defining_symbol_cache[(file_path, 20, 15, False)][0] != stamp
+        finally:
+            os.utime(absolute_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+    def test_request_defining_symbols_batch(self, language_server: SyncLanguageServer):
+        """Test that request_defining_symbols_batch yields the same results as individual request_defining_symbol calls."""
+        file_path = os.path.join("test_repo", "services.py")
+        locations = [(file_path, 21, 10), (file_path, 20, 15), (file_path, 3, 0), (file_path, 21, 10)]
+
+        defining_symbols = language_server.request_defining_symbols_batch(locations)
+
+        assert [s["name"] if s is not None else None for s in defining_symbols] == ["create_user", "User", None, "create_user"]
+        for location, defining_symbol in zip(locations, defining_symbols):
+            assert language_server.request_defining_symbol(*location) == defining_symbol
+
     def test_request_containing_symbol_variable(self, language_server: SyncLanguageServer):
         """Test request_containing_symbol where the symbol is a variable."""
         # Test for a position inside a variable definition